@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+download_bench.py – Offline benchmark of the downloader against dev_api_stub.
+
+Serves synthetic dumps (see synthetic.py), or a directory of recorded
+responses, through the local API stub with optional artificial latency and
+injected failures. It then downloads everything once per configuration,
+serial and concurrent, each run in a fresh process. It reports tables/s,
+rows/s, bytes/s received, requests, failures and peak RSS per configuration,
+plus the CPU cost per row of `normalize_row_keys`.
+
+    python3 -m benchmarks.download_bench --scale 1 --latency 0.05 --fail-rate 0.02
+    python3 -m benchmarks.download_bench --compare benchmarks/results/download-<previous>.json
+"""
+
+import argparse
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks import synthetic
+from benchmarks.harness import compare, peak_rss_mb, phase_result, print_results, run_in_child, write_results
+import dev_api_stub
+
+CONFIGURATIONS = {
+    # name: (DOWNLOAD_CONCURRENCY, EXPORT_PARTITIONS)
+    "serial": (1, 1),
+    "concurrent": (8, 4),
+}
+
+
+def run_download(api_url, out_dir, concurrency, partitions, partition_threshold, log_file, results):
+    import logging
+    import download_dev_table_data as downloader
+
+    logging.basicConfig(filename=log_file, level=logging.INFO, force=True)
+    downloader.API_URL = api_url
+    downloader.OUTPUT_DIR = out_dir
+    downloader.CONCURRENCY = concurrency
+    downloader.EXPORT_PARTITIONS = partitions
+    downloader.PARTITION_ROW_THRESHOLD = partition_threshold
+    started = time.perf_counter()
+    downloader.main()
+    results.append({"seconds": time.perf_counter() - started, "peak_rss_mb": peak_rss_mb()})
+
+
+def normalisation_cost(dump_dir, repeat=3):
+    """CPU µs per row spent in normalize_row_keys over every synthetic table."""
+    import json
+    from download_dev_table_data import normalize_row_keys
+
+    cpu, rows = 0.0, 0
+    for table in synthetic.TABLES:
+        with open(os.path.join(dump_dir, f"{table}_dump.json"), encoding="utf-8") as f:
+            data = json.load(f)
+        raw = [{key.lower(): value for key, value in row.items()} for row in data]   # API keys are lowercase
+        columns = list(data[0].keys())
+        for _ in range(repeat):
+            started = time.process_time()
+            normalize_row_keys(raw, columns)
+            cpu += time.process_time() - started
+            rows += len(raw)
+    return round(cpu / rows * 1e6, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for synthetic.BASE_ROWS")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--recordings", help="replay recorded responses (DEV_API_RECORD_DIR) before the dumps")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--partition-threshold", type=int, default=20000,
+                        help="row estimate above which tables are exported in id ranges")
+    parser.add_argument("--out", help="result file (default benchmarks/results/download-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="clone-download-bench-") as work_dir:
+        src_dir = os.path.join(work_dir, "src")
+        print(f"🧪 Generating synthetic dumps (scale={args.scale}) …")
+        counts = synthetic.write_dumps(src_dir, args.scale, args.seed)
+        total_rows = sum(counts.values())
+        server = dev_api_stub.serve(src_dir, port=0, latency=args.latency, jitter=args.jitter,
+                                    fail_rate=args.fail_rate, recordings=args.recordings, seed=args.seed)
+        api_url = f"http://127.0.0.1:{server.server_address[1]}{dev_api_stub.EXECUTE_PATH}"
+
+        phases = []
+        for name, (concurrency, partitions) in CONFIGURATIONS.items():
+            server.stats.reset()
+            out_dir = os.path.join(work_dir, name)
+            os.makedirs(out_dir)
+            run = run_in_child(run_download, api_url, out_dir, concurrency, partitions,
+                               args.partition_threshold, os.path.join(work_dir, f"{name}.log"))[0]
+            phase = phase_result(f"download.{name}", total_rows, run["seconds"], server.stats.requests)
+            phase["peak_rss_mb"] = run["peak_rss_mb"]
+            phase["tables_per_s"] = round(len(counts) / run["seconds"], 2)
+            phase["bytes_per_s"] = round(server.stats.bytes_sent / run["seconds"])
+            phase["failures_injected"] = server.stats.failures
+            phase["files_written"] = len(os.listdir(out_dir))
+            phases.append(phase)
+        server.shutdown()
+
+        normalise_us = normalisation_cost(src_dir)
+
+    result = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "rows": counts,
+        "python": platform.python_version(),
+        "stub": {"latency": args.latency, "jitter": args.jitter, "fail_rate": args.fail_rate},
+        "normalize_row_keys_cpu_us_per_row": normalise_us,
+        "phases": phases,
+    }
+    out = write_results(result, "download", args.out)
+    print_results(phases)
+    for phase in phases:
+        print(f"  {phase['phase']}: {phase['tables_per_s']} tables/s, "
+              f"{phase['bytes_per_s'] / 1e6:.1f} MB/s, {phase['failures_injected']} injected failures")
+    print(f"  normalize_row_keys: {normalise_us} µs CPU per row")
+    print(f"📄 Results written to {out}")
+    if args.compare and compare(result, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+harness.py – Shared plumbing for the benchmarks: running a phase group in a
+fresh process, peak RSS, result files, the per-phase table and regression
+comparison.
+
+A result file is a JSON object with a "phases" list; every phase has
+`phase`, `rows`, `seconds`, `rows_per_s`, `peak_rss_mb` and `round_trips`.
+"""
+
+import json
+import multiprocessing
+import os
+import resource
+import sys
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+REGRESSION_THRESHOLD = 0.10     # rows/s drop (fraction) reported as a regression
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def phase_result(name, rows, seconds, round_trips):
+    return {
+        "phase": name,
+        "rows": rows,
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds, 1) if seconds and rows else None,
+        "peak_rss_mb": peak_rss_mb(),
+        "round_trips": round_trips,
+    }
+
+
+def child(runner, args, conn):
+    results = []
+    try:
+        runner(*args, results)
+        conn.send(("ok", results))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def run_in_child(runner, *args):
+    """Run `runner(*args, results)` in a fresh process and return its `results` list."""
+    parent_conn, child_conn = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(target=child, args=(runner, args, child_conn))
+    process.start()
+    status, payload = parent_conn.recv()
+    process.join()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
+
+
+def write_results(result, kind, out=None):
+    out = out or os.path.join(RESULTS_DIR, f"{kind}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    return out
+
+
+def print_results(phases):
+    print(f"{'phase':<45} {'rows':>9} {'seconds':>9} {'rows/s':>10} {'rss MB':>8} {'trips':>8}")
+    for p in phases:
+        print(f"{p['phase']:<45} {p['rows']:>9} {p['seconds']:>9} {p['rows_per_s'] or '-':>10} "
+              f"{p['peak_rss_mb']:>8} {p['round_trips']:>8}")
+
+def compare(current, baseline_file):
+    """Print per-phase deltas against a previous result file; return True if any phase regressed."""
+    with open(baseline_file, encoding="utf-8") as f:
+        baseline = {p["phase"]: p for p in json.load(f)["phases"]}
+    regressed = False
+    print(f"\nCompared with {baseline_file}:")
+    for p in current["phases"]:
+        old = baseline.get(p["phase"])
+        if not old or not old["seconds"]:
+            continue
+        change = (p["seconds"] - old["seconds"]) / old["seconds"]
+        flag = ""
+        if old["rows_per_s"] and p["rows_per_s"] and p["rows_per_s"] < old["rows_per_s"] * (1 - REGRESSION_THRESHOLD):
+            flag = "  🚨 regression"
+            regressed = True
+        print(f"  {p['phase']:<45} {old['seconds']:>8}s → {p['seconds']:>8}s ({change:+.0%}) "
+              f"trips {old['round_trips']} → {p['round_trips']}{flag}")
+    return regressed
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+restore_bench.py – Benchmark the restore path against a local MySQL.
+
+Generates synthetic dumps (see synthetic.py), creates the matching tables in
+a throw-away schema, then runs the full `clean_and_restore` followed by each
+helpers loader, every one in a fresh process.  For each phase it records
+rows, wall time, rows/s, peak RSS and DB round trips (the server's
+`Questions` counter), and writes everything to a JSON file so runs can be
+compared for regressions.
+
+Point it at a disposable MySQL, e.g.:
+    docker run -d --name clone-bench -p 3307:3306 -e MYSQL_ROOT_PASSWORD=root mysql:8.0
+    BENCH_DB_PORT=3307 python3 -m benchmarks.restore_bench --scale 0.5
+    python3 -m benchmarks.restore_bench --compare benchmarks/results/restore-<previous>.json
+
+THE BENCH SCHEMA (BENCH_DB_NAME, default `clone_bench`) IS DROPPED AND RECREATED.
+"""
+
+import argparse
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pymysql
+
+from benchmarks import synthetic
+from benchmarks.harness import compare, phase_result, print_results, run_in_child, write_results
+from normalise_pool import iter_normalised
+
+DB = {
+    "host": os.getenv("BENCH_DB_HOST", "127.0.0.1"),
+    "port": int(os.getenv("BENCH_DB_PORT", 3306)),
+    "user": os.getenv("BENCH_DB_USER", "root"),
+    "password": os.getenv("BENCH_DB_PASS", "root"),
+    "database": os.getenv("BENCH_DB_NAME", "clone_bench"),
+}
+
+
+# ---- DB HELPERS ----
+def server_connection(database=None):
+    return pymysql.connect(host=DB["host"], port=DB["port"], user=DB["user"], password=DB["password"],
+                           database=database, autocommit=True)
+
+def questions():
+    """Server-wide statement counter; on a dedicated bench server the delta is our round-trip count."""
+    with server_connection() as conn, conn.cursor() as cur:
+        cur.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+        return int(cur.fetchone()[1])
+
+def create_schema():
+    with server_connection() as conn, conn.cursor() as cur:
+        cur.execute(f"DROP DATABASE IF EXISTS `{DB['database']}`")
+        cur.execute(f"CREATE DATABASE `{DB['database']}` CHARACTER SET utf8mb4")
+        cur.execute(f"USE `{DB['database']}`")
+        for table in synthetic.TABLES:
+            cur.execute(synthetic.create_table_sql(table))
+        cur.execute("SELECT VERSION()")
+        return cur.fetchone()[0]
+
+
+# ---- PHASE RUNNERS (executed in child processes) ----
+def measure(name, rows, fn, results):
+    before = questions()
+    started = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - started
+    results.append(phase_result(name, rows, seconds, questions() - before - 1))   # minus our own status query
+
+def run_clean_and_restore(dump_dir, counts, log_file, results):
+    import clean_up_local_db as restore
+
+    restore.CONFIG.update(DB)
+    restore.DUMP_DIR = dump_dir
+    logging.basicConfig(filename=log_file, level=logging.INFO)
+    total_rows = sum(counts.values())
+    # Time the phases of clean_and_restore individually by wrapping them in place;
+    # clean_and_restore resolves them from the module at call time.
+    for phase, rows in (("verify_insert_order", 0), ("delete_all_data_in_order", 0),
+                        ("insert_all_data_in_order", total_rows)):
+        original = getattr(restore, phase)
+        setattr(restore, phase, lambda *a, _fn=original, _p=phase, _r=rows: measure(
+            f"clean_and_restore.{_p}", _r, lambda: _fn(*a), results))
+    measure("clean_and_restore", total_rows, lambda: restore.clean_and_restore(log_file), results)
+
+def run_helper(table, dump_dir, counts, log_file, results):
+    path = Path(dump_dir, "helpers", f"{table}_dump.json")
+    helper_env = {"DB_HOST": DB["host"], "DB_PORT": str(DB["port"]), "DB_USER": DB["user"],
+                  "DB_PASS": DB["password"], "DB_NAME": DB["database"]}
+    os.environ.update(helper_env)
+
+    if table == "makes":
+        from helpers import bulk_makes_loader as loader
+        fn = lambda: loader.bulk_insert_makes(iter_normalised(loader.load_json(path), loader.normalise))
+    elif table == "model":
+        from helpers import bulk_model_loader as loader
+        fn = lambda: loader.bulk_insert_models(iter_normalised(loader.load_json(path), loader.normalise))
+    elif table == "price":
+        from helpers import bulk_price_loader as loader
+        fn = lambda: loader.clone_price_table(path)
+    elif table == "variant_car":
+        from helpers import bulk_car_variants_loader as loader
+        loader.JSON_FILE = path
+        fn = loader.main
+    elif table == "media_folder":
+        from helpers import bulk_media_folder_loader as loader
+        fn = lambda: loader.bulk_insert_folders([loader.normalise_row(js) for js in loader.load_json(path)])
+    else:
+        from helpers import bulk_media_library_loader as loader
+        fn = lambda: loader.bulk_insert_media([loader.normalise_row(js) for js in loader.load_json(path)])
+    loader.CONFIG.update(DB)
+    measure(f"helpers.{table}", counts[table], fn, results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplier for synthetic.BASE_ROWS")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-helpers", action="store_true")
+    parser.add_argument("--out", help="result file (default benchmarks/results/restore-<timestamp>.json)")
+    parser.add_argument("--compare", help="previous result file to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="clone-bench-") as dump_dir:
+        print(f"🧪 Generating synthetic dumps (scale={args.scale}) …")
+        counts = synthetic.write_dumps(dump_dir, args.scale, args.seed)
+        version = create_schema()
+        log_file = os.path.join(dump_dir, "bench.log")
+
+        phases = run_in_child(run_clean_and_restore, dump_dir, counts, log_file)
+        if not args.skip_helpers:
+            for table in synthetic.TABLES:
+                phases += run_in_child(run_helper, table, dump_dir, counts, log_file)
+
+    result = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "scale": args.scale,
+        "rows": counts,
+        "python": platform.python_version(),
+        "mysql": version,
+        "phases": phases,
+    }
+    out = write_results(result, "restore", args.out)
+    print_results(phases)
+    print(f"📄 Results written to {out}")
+    if args.compare and compare(result, args.compare):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
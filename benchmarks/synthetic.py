@@ -0,0 +1,187 @@
+"""
+synthetic.py – Synthetic dumps and DDL shaped like the real dev tables.
+
+Generates `model` (the ~70 columns of helpers/bulk_model_loader.COLUMNS,
+with self-referencing `nextModelId` and JSON `keyHighlights`), `makes`,
+`media_folder`, `media_library`, `variant_car` (nested JSON `colorDetails`)
+and `price`, at a configurable scale.
+
+Two dump flavours are written:
+  • `<table>_dump.json`          – real column names, as download_dev_table_data writes them
+  • `helpers/<table>_dump.json`  – lowercase keys and ISO timestamps, as the helpers loaders expect
+plus a `manifest.json` for the first flavour, like the downloader's.
+"""
+
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+from helpers.bulk_makes_loader import COLUMNS as MAKES_COLUMNS
+from helpers.bulk_media_folder_loader import COLUMNS as MEDIA_FOLDER_COLUMNS
+from helpers.bulk_media_library_loader import COLUMNS as MEDIA_LIBRARY_COLUMNS
+from helpers.bulk_model_loader import COLUMNS as MODEL_COLUMNS
+from helpers.bulk_price_loader import COLUMNS as PRICE_COLUMNS
+from manifest import merge_manifest, schema_fingerprint, write_json_atomic
+from schema_sync import SCHEMA_CACHE_FILE
+
+# Rows per table at scale 1.0
+BASE_ROWS = {
+    "media_folder": 50,
+    "media_library": 5000,
+    "makes": 50,
+    "model": 2000,
+    "variant_car": 6000,
+    "price": 50000,
+}
+
+VARIANT_CAR_COLUMNS = (
+    "id", "name", "slug", "modelId", "colorDetails", "isActive",
+    "createdAt", "updatedAt", "publishedAt", "productType",
+)
+
+TABLE_COLUMNS = {
+    "media_folder": MEDIA_FOLDER_COLUMNS,
+    "media_library": MEDIA_LIBRARY_COLUMNS,
+    "makes": MAKES_COLUMNS,
+    "model": MODEL_COLUMNS,
+    "variant_car": VARIANT_CAR_COLUMNS,
+    "price": ("id",) + PRICE_COLUMNS,
+}
+
+# Same order as clean_up_local_db.INSERT_ORDER
+TABLES = ("media_folder", "media_library", "makes", "model", "variant_car", "price")
+
+FOREIGN_KEYS = {
+    "media_library": [("folderId", "media_folder")],
+    "model": [("makeId", "makes"), ("nextModelId", "model")],
+    "variant_car": [("modelId", "model")],
+    "price": [("modelId", "model")],
+}
+
+DATE_COLUMNS = {
+    "createdAt", "updatedAt", "publishedAt", "launchedDate",
+    "discontinuedDate", "estimatedLaunchedDate",
+}
+JSON_COLUMNS = {"keyHighlights", "colorDetails", "keyFactors"}
+TEXT_SUFFIXES = ("Summary", "Pros", "Cons")
+NUMERIC_HINTS = ("Percentage", "Rating", "Helpfulness", "Price", "Score", "Tax", "tcs", "Fees",
+                 "Charges", "Cess", "insurance")
+
+
+def column_type(table, col):
+    if col == "id":
+        return "INT NOT NULL" + (" AUTO_INCREMENT" if table == "price" else "")
+    if col in DATE_COLUMNS:
+        return "DATETIME NULL"
+    if col in JSON_COLUMNS:
+        return "JSON NULL"
+    if col.startswith("is"):
+        return "TINYINT(1) NOT NULL DEFAULT 0"
+    if col.endswith("Id") or col.endswith("_id") or col in ("order", "featureVideoStartTime", "featureVideoEndTime"):
+        return "INT NULL"
+    if col.endswith(TEXT_SUFFIXES):
+        return "TEXT NULL"
+    if any(hint in col for hint in NUMERIC_HINTS) or col.startswith("avg") or col.startswith("total"):
+        return "DECIMAL(12,2) NULL"
+    return "VARCHAR(255) NULL"
+
+
+def create_table_sql(table):
+    lines = [f"  `{col}` {column_type(table, col)}" for col in TABLE_COLUMNS[table]]
+    lines.append("  PRIMARY KEY (`id`)")
+    if table == "price":
+        lines.append("  UNIQUE KEY `uq_price_variant_state` (`modelId`, `variantId`, `stateId`)")
+        lines.append("  KEY `idx_price_state` (`stateId`)")
+    if table == "model":
+        lines.append("  UNIQUE KEY `uq_model_slug` (`slug`)")
+    for i, (col, ref) in enumerate(FOREIGN_KEYS.get(table, ())):
+        lines.append(f"  CONSTRAINT `fk_{table}_{i}` FOREIGN KEY (`{col}`) REFERENCES `{ref}` (`id`)")
+    body = ",\n".join(lines)
+    return f"CREATE TABLE `{table}` (\n{body}\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+
+
+def schema_columns(table):
+    """The table's columns as the downloader fetches them from information_schema ([{name, key, type}])."""
+    return [
+        {"name": col, "key": "PRI" if col == "id" else "", "type": column_type(table, col).split()[0].split("(")[0].lower()}
+        for col in TABLE_COLUMNS[table]
+    ]
+
+
+def _value(table, col, i, counts, rnd, base_time):
+    if col == "id":
+        return i + 1
+    if col == "nextModelId":
+        return i + 2 if i + 1 < counts["model"] and rnd.random() < 0.3 else None
+    if col in ("modelId", "makeId", "folderId", "parentId"):
+        ref = {"modelId": "model", "makeId": "makes", "folderId": "media_folder", "parentId": None}[col]
+        return rnd.randint(1, counts[ref]) if ref else None
+    if col == "variantId":
+        return i // 40 + 1
+    if col == "stateId":
+        return i % 40 + 1
+    if col == "slug":
+        return f"{table}-{i + 1}"
+    if col in DATE_COLUMNS:
+        return (base_time + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")
+    if col == "keyHighlights":
+        return json.dumps([f"highlight {n}" for n in range(rnd.randint(1, 4))])
+    if col == "colorDetails":
+        return [{"name": f"color-{n}", "hex": f"#{rnd.randrange(1 << 24):06x}", "imageId": rnd.randint(1, 5000)}
+                for n in range(rnd.randint(1, 5))]
+    if col == "keyFactors":
+        return json.dumps({"factor": rnd.randint(1, 10)})
+    kind = column_type(table, col)
+    if kind.startswith("TINYINT"):
+        return rnd.random() < 0.8
+    if kind.startswith("INT"):
+        return rnd.randint(1, 1000)
+    if kind.startswith("DECIMAL"):
+        return round(rnd.uniform(0, 100000), 2)
+    if kind.startswith("TEXT"):
+        return " ".join(rnd.choice(("smooth", "reliable", "heavy", "quiet", "frugal", "sporty")) for _ in range(30))
+    return f"{col}-{rnd.randrange(100000)}"
+
+
+def generate_rows(table, counts, seed=42):
+    rnd = random.Random(f"{seed}-{table}")
+    base_time = datetime(2024, 1, 1)
+    columns = TABLE_COLUMNS[table]
+    return [{col: _value(table, col, i, counts, rnd, base_time) for col in columns} for i in range(counts[table])]
+
+
+def helper_row(row):
+    """Lowercase keys and ISO-8601 timestamps with offset, like the raw API rows the helpers read."""
+    out = {}
+    for col, val in row.items():
+        if col in DATE_COLUMNS and val:
+            val = val.replace(" ", "T") + "+05:30"
+        out[col.lower()] = val
+    return out
+
+
+def row_counts(scale):
+    return {table: max(1, int(rows * scale)) for table, rows in BASE_ROWS.items()}
+
+
+def write_dumps(out_dir, scale=1.0, seed=42):
+    """Write both dump flavours under `out_dir` and return {table: row_count}."""
+    counts = row_counts(scale)
+    os.makedirs(os.path.join(out_dir, "helpers"), exist_ok=True)
+    entries, schema_cache = {}, {}
+    for table in TABLES:
+        rows = generate_rows(table, counts, seed)
+        restore_rows = [
+            {col: (json.dumps(val) if isinstance(val, (list, dict)) else val) for col, val in row.items()}
+            for row in rows
+        ]
+        file_entry = write_json_atomic(os.path.join(out_dir, f"{table}_dump.json"), restore_rows, indent=None)
+        columns = schema_columns(table)
+        entries[table] = {"rows": counts[table], "files": [file_entry], "schema": schema_fingerprint(columns)}
+        schema_cache[table] = {"columns": columns, "create_table": create_table_sql(table)}
+        with open(os.path.join(out_dir, "helpers", f"{table}_dump.json"), "w", encoding="utf-8") as f:
+            json.dump([helper_row(row) for row in rows], f, ensure_ascii=False)
+    write_json_atomic(os.path.join(out_dir, SCHEMA_CACHE_FILE), schema_cache)
+    merge_manifest(out_dir, entries)
+    return counts
@@ -1,38 +1,99 @@
 
 import os
+import glob
 import json
 import logging
 import pymysql
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import index_defer
+import manifest
+import metrics
+from local_db import CONFIG, DELETE_ORDER, INSERT_ORDER, get_connection, verify_insert_order
+from progress import NULL_PROGRESS, Progress
+from rejects import RejectSink
+from schema_sync import MODES as SCHEMA_SYNC_MODES, load_schema_cache, reconcile_schema
+from table_rows import TableRows
 
 # ---- CONFIG ----
-CONFIG = {
-    "host": "127.0.0.1",
-    "port": 3306,
-    "user": "root",
-    "password": "root",
-    "database": "cms_bike_backend"
-}
 DUMP_DIR = "dev-db-data"
-
-# ---- DB CONNECTION ----
-def get_connection():
-    return pymysql.connect(
-        host=CONFIG["host"],
-        port=CONFIG["port"],
-        user=CONFIG["user"],
-        password=CONFIG["password"],
-        database=CONFIG["database"],
-        charset='utf8mb4',
-        cursorclass=pymysql.cursors.DictCursor,
-        autocommit=True
-    )
+RESTORE_WORKERS = int(os.getenv("RESTORE_WORKERS", 4))   # parallel shard loaders per table
+VERIFY_CHECKSUMS = os.getenv("VERIFY_CHECKSUMS", "1") != "0"  # sha256 every dump before wiping (else size only)
+MANIFEST = {}                                             # manifest.json of DUMP_DIR, loaded by validate_dumps()
+BATCH_SIZE = 500                                          # rows between progress updates
+PROGRESS = NULL_PROGRESS
+REJECTS = RejectSink()                                    # failed rows → rejects/<table>.ndjson
+SCHEMA_SYNC = os.getenv("SCHEMA_SYNC", "add")             # add | drop | off, see schema_sync.py
+ALLOWED_COLUMNS = {}                                      # table → dump keys the local table accepts
+SKIPPED_TABLES = set()                                    # neither wiped nor reloaded: no local table or bad dump
+# Tables loaded with their secondary indexes dropped and rebuilt afterwards (opt-in), e.g. "price,user_review,leads"
+DEFER_INDEX_TABLES = [t.strip() for t in os.getenv("DEFER_INDEX_TABLES", "").split(",") if t.strip()]
 
 # ---- UTILITY METHODS ----
-def load_dump_data(table):
+# Columns written in a second pass because they reference rows of the same table.
+DEFERRED_COLUMNS = {
+    "model": ("nextModelId",),
+}
+
+def find_dump_files(table):
+    """Shard files of a range-partitioned export, else the single dump file."""
+    shards = sorted(glob.glob(os.path.join(DUMP_DIR, f"{table}_dump.part-*.json")))
+    if shards:
+        return shards
     file_path = os.path.join(DUMP_DIR, f"{table}_dump.json")
     if not os.path.exists(file_path):
         file_path = os.path.join(DUMP_DIR, f"{table}.json")
+    return [file_path]
+
+def dump_files(table):
+    """The table's files as listed in the manifest, or whatever is on disk for manifest-less dumps."""
+    if table in MANIFEST:
+        return [os.path.join(DUMP_DIR, f["file"]) for f in MANIFEST[table]["files"]]
+    return find_dump_files(table)
+
+def legacy_dump_problem(table):
+    """Manifest-less dump directory: every file must exist and not be cut off mid-array."""
+    for file_path in find_dump_files(table):
+        if not os.path.exists(file_path):
+            return f"{os.path.basename(file_path)} is missing"
+        if not manifest.ends_like_json_array(file_path):
+            return f"{os.path.basename(file_path)} is truncated"
+    return None
+
+def validate_dumps(tables):
+    """
+    Check every table's replacement dump before anything is wiped; tables whose dump is
+    missing or corrupt are added to SKIPPED_TABLES so their local rows are left alone.
+    """
+    MANIFEST.clear()
+    loaded = manifest.load_manifest(DUMP_DIR)
+    MANIFEST.update(loaded or {})
+    schema_cache = load_schema_cache(DUMP_DIR)
+    invalid = {}
+    with metrics.timed("validate", rows=0) as m:
+        for table in tables:
+            if table in SKIPPED_TABLES:
+                continue
+            if loaded is None:
+                problem = legacy_dump_problem(table)
+            elif table not in MANIFEST:
+                problem = "not in the manifest (download failed or never ran)"
+            else:
+                on_disk = [f for f in find_dump_files(table) if os.path.exists(f)]
+                columns = schema_cache.get(table, {}).get("columns")
+                problem = manifest.validate_table(DUMP_DIR, MANIFEST[table], on_disk, VERIFY_CHECKSUMS, columns)
+            if problem:
+                invalid[table] = problem
+            m["rows"] += MANIFEST.get(table, {}).get("rows", 0)
+        m["failed"] = len(invalid)
+    for table, problem in invalid.items():
+        logging.error(f"❌ {table}: dump unusable ({problem}) – keeping the local table as it is")
+        print(f"🛑 {table}: dump unusable ({problem}) – not wiping or reloading it")
+    SKIPPED_TABLES.update(invalid)
+    return invalid
+
+def load_dump_file(table, file_path):
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             return json.load(f)
@@ -40,154 +101,199 @@ def load_dump_data(table):
         logging.error(f"❌ Failed to load dump for {table}: {e}")
         return []
 
-def insert_sql(cursor, table, row):
-    columns = row.keys()
+def load_dump_data(table):
+    data = []
+    for file_path in dump_files(table):
+        data.extend(load_dump_file(table, file_path))
+    return data
+
+def load_table_rows(table, file_path=None, defer=True):
+    files = [file_path] if file_path else dump_files(table)
+    with metrics.timed("parse", table) as m:
+        data = load_dump_file(table, file_path) if file_path else load_dump_data(table)
+        m["rows"] = len(data)
+        m["bytes"] = sum(os.path.getsize(f) for f in files if os.path.exists(f))
+    if not data:
+        return None
+    with metrics.timed("normalise", table, rows=len(data)):
+        deferred = DEFERRED_COLUMNS.get(table, ()) if defer else ()
+        return TableRows.from_dicts(table, data, deferred, ALLOWED_COLUMNS.get(table))
+
+def build_insert_sql(table, columns):
     placeholders = ", ".join(["%s"] * len(columns))
     quoted_columns = ", ".join([f"`{col}`" for col in columns])
-    sql = f"INSERT INTO `{table}` ({quoted_columns}) VALUES ({placeholders})"
-    values = tuple(row[col] for col in columns)
+    return f"INSERT INTO `{table}` ({quoted_columns}) VALUES ({placeholders})"
+
+def insert_sql(cursor, table, sql, columns, values):
     try:
         cursor.execute(sql, values)
+        return True
     except pymysql.MySQLError as e:
-        logging.error(f"❌ Insert failed for {table}: {e} — Row: {row}")
+        REJECTS.reject(table, columns, values, e)
+        return False
 
 def insert_data(table, data):
     if not data:
         logging.warning(f"⚠️  No data found for table: {table}")
         return
-    try:
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                for i in range(0, len(data), 20):
-                    batch = data[i:i + 20]
-                    for row in batch:
-                        insert_sql(cursor, table, row)
-    except pymysql.MySQLError as e:
-        logging.error(f"❌ Unexpected DB failure for {table}: {e}")
+    sql = build_insert_sql(table, data.columns)
+    with metrics.timed("insert", table, rows=len(data), failed=0, round_trips=0) as m:
+        try:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    for _, batch in data.chunks(BATCH_SIZE):
+                        for values in batch:
+                            m["round_trips"] += 1
+                            if not insert_sql(cursor, table, sql, data.columns, values):
+                                m["failed"] += 1
+                        PROGRESS.advance(table, len(batch))
+        except pymysql.MySQLError as e:
+            logging.error(f"❌ Unexpected DB failure for {table}: {e}")
+            m["failed"] = len(data) - (m["round_trips"] - m["failed"])
+
+def insert_shards(table, shard_files):
+    """Load and insert the shards of one table in parallel, each worker on its own connection."""
+    def load_shard(file_path):
+        insert_data(table, load_table_rows(table, file_path))
+
+    logging.info(f"🧩 Loading {len(shard_files)} shards of {table} with {RESTORE_WORKERS} workers")
+    with ThreadPoolExecutor(max_workers=RESTORE_WORKERS) as pool:
+        for future in [pool.submit(load_shard, file_path) for file_path in shard_files]:
+            future.result()
 
 def insert_model_in_two_passes(model_data):
     if not model_data:
         logging.warning("⚠️ No model data to insert.")
         return
-    try:
-        with get_connection() as conn:
-            with conn.cursor() as cursor:
-                for row in model_data:
-                    temp = row.copy()
-                    temp["nextModelId"] = None
-                    insert_sql(cursor, 'model', temp)
-                for row in model_data:
-                    if row.get("nextModelId"):
-                        try:
-                            cursor.execute(
-                                "UPDATE model SET nextModelId=%s WHERE id=%s",
-                                (row["nextModelId"], row["id"])
-                            )
-                        except pymysql.MySQLError as e:
-                            logging.error(f"❌ Failed to update nextModelId in model (id={row['id']}): {e}")
-    except pymysql.MySQLError as e:
-        logging.error(f"❌ DB failure during model 2-pass insert: {e}")
-
-# ---- RESTORE ORDERS ----
-INSERT_ORDER = [
-    'media_folder',
-    'media_library',
-    'state',
-    'city',
-    'area',
-    'dealer',
-    'partner',
-    'makes',
-    'tag',
-    'model',
-    'variant',
-    'model_video',
-    'model_video_category',
-    'model_video_header',
-    'celebrity',
-    'model_celebrity',
-    'model_color_image',
-    'model_image',
-    'model_tags',
-    'awards',
-    'model_awards',
-    'model_spec',
-    'model_spec_image',
-    'widget_data',
-    'expert_review',
-    'fun_fact',
-    'modelGncap',
-    'thought',
-    'variant_tags',
-    'variant_car',
-    'price',
-    'dealer_makes',
-    'dealer_partner',
-    'make_tags',
-    'image_tags',
-    'user_review',
-    'user_review_image',
-    'social_review',
-    'social_review_comment',
-    'leads',
-    'schedule_lead',
-    'partner_lead',
-    'other_popular_makes',
-    'state_wise_make_registration',
-    'review_report',
-    'monthly_sales'
-]
-
-DELETE_ORDER = list(reversed(INSERT_ORDER))
-
-# ---- VERIFY ORDER ----
-def verify_insert_order(order):
-    position = {table: i for i, table in enumerate(order)}
-    with get_connection() as conn:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT TABLE_NAME, REFERENCED_TABLE_NAME
-                FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
-                WHERE TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME IS NOT NULL
-            """, (CONFIG["database"],))
-            errors = []
-            for row in cursor.fetchall():
-                dependent = row["TABLE_NAME"]
-                referenced = row["REFERENCED_TABLE_NAME"]
-                if dependent in position and referenced in position:
-                    if position[dependent] < position[referenced]:
-                        errors.append(f"❌ {dependent} comes before its dependency {referenced}")
-            if errors:
-                print("🚨 Invalid INSERT_ORDER detected:")
-                for err in errors:
-                    print(err)
-            else:
-                print("✅ INSERT_ORDER is valid and FK-safe.")
+    sql = build_insert_sql("model", model_data.columns)
+    with metrics.timed("insert", "model", rows=len(model_data), failed=0, round_trips=0) as m:
+        try:
+            with get_connection() as conn:
+                with conn.cursor() as cursor:
+                    # nextModelId is already NULL in the row tuples; real values sit in the side array.
+                    for _, batch in model_data.chunks(BATCH_SIZE):
+                        for values in batch:
+                            m["round_trips"] += 1
+                            if not insert_sql(cursor, "model", sql, model_data.columns, values):
+                                m["failed"] += 1
+                        PROGRESS.advance("model", len(batch))
+                    if "nextModelId" not in model_data.deferred:
+                        return
+                    ids = model_data.column("id")
+                    for model_id, next_model_id in zip(ids, model_data.deferred["nextModelId"]):
+                        if next_model_id:
+                            m["round_trips"] += 1
+                            try:
+                                cursor.execute(
+                                    "UPDATE model SET nextModelId=%s WHERE id=%s",
+                                    (next_model_id, model_id)
+                                )
+                            except pymysql.MySQLError as e:
+                                m["failed"] += 1
+                                REJECTS.reject("model", ("id", "nextModelId"), (model_id, next_model_id), e, op="update")
+        except pymysql.MySQLError as e:
+            logging.error(f"❌ DB failure during model 2-pass insert: {e}")
 
 # ---- DELETE AND INSERT ----
-def delete_all_data_in_order():
-    with get_connection() as conn:
+def delete_all_data_in_order(config=None, skipped=None):
+    """Wipe every table in DELETE_ORDER except `skipped` (default SKIPPED_TABLES)."""
+    skipped = SKIPPED_TABLES if skipped is None else skipped
+    target = {"target": config["database"]} if config else {}
+    with get_connection(config) as conn:
         with conn.cursor() as cursor:
             cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
             for table in DELETE_ORDER:
-                try:
-                    logging.info(f"🚮 Deleting from table: {table}")
-                    cursor.execute(f"DELETE FROM `{table}`")
-                except Exception as e:
-                    logging.error(f"❌ Failed to delete from {table}: {e}")
+                if table in skipped:
+                    continue
+                with metrics.timed("wipe", table, round_trips=1, **target) as m:
+                    try:
+                        logging.info(f"🚮 Deleting from table: {table}")
+                        m["rows"] = cursor.execute(f"DELETE FROM `{table}`")
+                    except Exception as e:
+                        m["failed"] = 1
+                        logging.error(f"❌ Failed to delete from {table}: {e}")
             cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
 
+def expected_row_counts():
+    """Rows per table from the manifest (progress totals); empty for manifest-less dumps."""
+    return {table: entry["rows"] for table, entry in MANIFEST.items()}
+
+def sync_schema(tables=None):
+    """Create missing tables / columns from the dev schema cache before anything is wiped."""
+    if SCHEMA_SYNC not in SCHEMA_SYNC_MODES:
+        raise ValueError(f"SCHEMA_SYNC must be one of {', '.join(SCHEMA_SYNC_MODES)}, got {SCHEMA_SYNC!r}")
+    ALLOWED_COLUMNS.clear()
+    SKIPPED_TABLES.clear()
+    if SCHEMA_SYNC == "off":
+        return
+    schema_cache = load_schema_cache(DUMP_DIR)
+    if not schema_cache:
+        logging.warning("⚠️ No schema cache found – skipping schema reconciliation (re-run the download to create it).")
+        return
+    with metrics.timed("schema_sync") as m:
+        with get_connection() as conn:
+            allowed, unusable = reconcile_schema(conn, CONFIG["database"], schema_cache, tables or INSERT_ORDER,
+                                                 SCHEMA_SYNC)
+        ALLOWED_COLUMNS.update(allowed)
+        SKIPPED_TABLES.update(unusable)
+        m["tables"] = len(allowed)
+        m["failed"] = len(unusable)
+
+def insert_table(table):
+    if table in SKIPPED_TABLES:
+        logging.warning(f"⚠️ Skipping {table}: no local table or no usable dump.")
+        return
+    files = dump_files(table)
+    if table == "model":
+        data = load_table_rows(table)
+        if data:
+            PROGRESS.set_total(table, len(data))
+        insert_model_in_two_passes(data)
+    elif len(files) > 1:
+        insert_shards(table, files)
+    else:
+        data = load_table_rows(table)
+        if data:
+            PROGRESS.set_total(table, len(data))
+        insert_data(table, data)
+
+def insert_table_with_deferred_indexes(table):
+    """Drop the table's secondary indexes, load it, then rebuild them in one ALTER TABLE."""
+    with get_connection() as conn:
+        with metrics.timed("index_drop", table, indexes=0) as m:
+            try:
+                m["indexes"] = index_defer.drop_secondary_indexes(conn, table, DUMP_DIR)
+            except pymysql.MySQLError as e:
+                # The table is already wiped: load it with its indexes live rather than abort the restore.
+                m["failed"] = 1
+                logging.error(f"❌ Could not drop the secondary indexes of {table}, loading it with them: {e}")
+                index_defer.recover_pending(conn, DUMP_DIR)   # clears the ledger entry (re-adds anything dropped)
+    try:
+        insert_table(table)
+    finally:
+        if m["indexes"]:
+            with get_connection() as conn, metrics.timed("index_rebuild", table) as m:
+                m["indexes"] = index_defer.rebuild_indexes(conn, table, DUMP_DIR)
+
 def insert_all_data_in_order():
-    for table in INSERT_ORDER:
-        data = load_dump_data(table)
-        logging.info(f"📥 Inserting into table: {table}")
-        if table == "model":
-            insert_model_in_two_passes(data)
-        else:
-            insert_data(table, data)
+    global PROGRESS
+    counts = expected_row_counts()
+    PROGRESS = Progress("📥 restore", totals={t: counts[t] for t in INSERT_ORDER if t in counts})
+    try:
+        for table in INSERT_ORDER:
+            logging.info(f"📥 Inserting into table: {table}")
+            PROGRESS.start(table)
+            if table in DEFER_INDEX_TABLES and table not in SKIPPED_TABLES:
+                insert_table_with_deferred_indexes(table)
+            else:
+                insert_table(table)
+            PROGRESS.finish(table)
+    finally:
+        PROGRESS.close()
+        PROGRESS = NULL_PROGRESS
 
 # ---- MAIN ENTRY ----
-def clean_and_restore(LOG_FILE):
+def setup_logging(LOG_FILE):
     logging.basicConfig(
     filename=LOG_FILE,
     level=logging.INFO,
@@ -196,10 +302,50 @@ def clean_and_restore(LOG_FILE):
     filemode='a'  # Always append
 )
 
+def prepare_restore(LOG_FILE):
+    """Pre-flight shared by every restore mode; nothing is deleted here."""
+    setup_logging(LOG_FILE)
+    sync_schema()
+    validate_dumps(INSERT_ORDER)
+    with get_connection() as conn:
+        index_defer.recover_pending(conn, DUMP_DIR)
     verify_insert_order(INSERT_ORDER)
+    REJECTS.clear(INSERT_ORDER)
+
+def report_rejects():
+    rejected = sum(REJECTS.close().values())
+    if rejected:
+        print(f"⚠️  {rejected} rows rejected – see `{REJECTS.directory}/`, re-play with `python3 rejects.py replay`.")
+    return rejected
+
+def clean_and_restore(LOG_FILE):
+    prepare_restore(LOG_FILE)
     delete_all_data_in_order()
-    insert_all_data_in_order()
+    try:
+        insert_all_data_in_order()
+    finally:
+        report_rejects()
     print("✅ Database restoration completed successfully.")
 
+def load_single_table(table, LOG_FILE):
+    """Wipe and reload one table from its dump, after the same schema and dump checks as a full restore."""
+    setup_logging(LOG_FILE)
+    sync_schema([table])
+    validate_dumps([table])
+    if table in SKIPPED_TABLES:
+        print(f"🛑 {table} was left untouched.")
+        return
+    REJECTS.clear([table])
+    with get_connection() as conn:
+        with conn.cursor() as cursor, metrics.timed("wipe", table, round_trips=1) as m:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+            m["rows"] = cursor.execute(f"DELETE FROM `{table}`")
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    try:
+        insert_table(table)
+    finally:
+        report_rejects()
+    print(f"✅ {table} reloaded.")
+
 if __name__ == "__main__":
-    clean_and_restore()
\ No newline at end of file
+    clean_and_restore()
@@ -0,0 +1,121 @@
+"""
+dev_api_client.py – asyncio client for the dev `/misc/execute` API.
+
+One aiohttp session is shared by every call, so TLS connections to the dev
+backend are opened once and kept alive.  Up to `concurrency` queries are in
+flight at the same time (one keep-alive connection each), responses are
+transparently gzip/deflate-decompressed, and 429 / 5xx / timeouts are
+retried with exponential backoff and full jitter.
+
+    async with DevApiClient(API_URL, HEADERS, concurrency=8) as client:
+        result = await client.execute("SELECT 1;")
+
+Set DEV_API_RECORD_DIR to save every response body under its query key;
+dev_api_stub.py --recordings replays them offline.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+
+import aiohttp
+
+from recordings import RECORD_DIR, recording_path
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+LARGE_BODY_BYTES = 1 << 20
+
+
+class DevApiError(Exception):
+    pass
+
+
+class DevApiTimeout(DevApiError):
+    pass
+
+
+class DevApiClient:
+    def __init__(self, url, headers, concurrency=8, timeout=30, max_retries=5,
+                 backoff_base=0.5, backoff_cap=20.0, record_dir=RECORD_DIR):
+        self.url = url
+        self.headers = dict(headers)
+        self.headers.setdefault("Accept-Encoding", "gzip, deflate")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.record_dir = record_dir
+        self.request_count = 0
+        self._session = None
+        self._slots = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(connector=connector, headers=self.headers, auto_decompress=True)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    def _record(self, query, body):
+        os.makedirs(self.record_dir, exist_ok=True)
+        with open(recording_path(self.record_dir, query), "wb") as f:
+            f.write(body)
+
+    def _backoff(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(self.backoff_cap, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    async def execute_raw(self, query, timeout=None, retry_timeouts=True):
+        """POST one query and return the (decompressed) response body as bytes."""
+        timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                async with self._slots:
+                    self.request_count += 1
+                    async with self._session.post(self.url, json={"query": query}, timeout=timeout) as response:
+                        if response.status not in RETRY_STATUSES:
+                            response.raise_for_status()
+                            body = await response.read()
+                            if self.record_dir:
+                                await asyncio.to_thread(self._record, query, body)
+                            return body
+                        retry_after = response.headers.get("Retry-After")
+                        error = DevApiError(f"HTTP {response.status}")
+            except asyncio.TimeoutError:
+                error = DevApiTimeout(f"Timed out after {timeout.total}s")
+                if not retry_timeouts:
+                    raise error
+            except aiohttp.ClientResponseError as e:
+                raise DevApiError(f"HTTP {e.status}: {e.message}") from e
+            except aiohttp.ClientConnectionError as e:
+                error = DevApiError(f"Connection error: {e}")
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = self._backoff(attempt, retry_after)
+            logging.warning(f"🔁 Retrying query in {delay:.1f}s ({error}, attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def execute_with_size(self, query, timeout=None, retry_timeouts=True):
+        """Like execute(), but also return the size of the response body in bytes."""
+        body = await self.execute_raw(query, timeout, retry_timeouts)
+        if len(body) > LARGE_BODY_BYTES:
+            return await asyncio.to_thread(json.loads, body), len(body)  # keep the event loop free
+        return json.loads(body), len(body)
+
+    async def execute(self, query, timeout=None, retry_timeouts=True):
+        result, _ = await self.execute_with_size(query, timeout, retry_timeouts)
+        return result
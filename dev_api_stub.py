@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+dev_api_stub.py – Local stand-in for the dev `/api/v1/misc/execute` endpoint.
+
+Answers from recorded responses first (`--recordings`, captured with
+DEV_API_RECORD_DIR, see dev_api_client.py) and otherwise from the tables
+found in a dump directory (`<table>_dump.json`), using the same
+`{"data": {"success", "data"}}` envelope as the real backend, over
+HTTP/1.1 keep-alive with optional gzip.  Only the query shapes issued by
+download_dev_table_data are understood.
+
+Artificial latency and injected failures (HTTP errors, stalls past the
+client timeout) make retry and adaptive-paging behaviour reproducible.
+
+    python3 dev_api_stub.py --dump-dir dev-db-data --port 8765 --latency 0.2 --fail-rate 0.05
+    DEV_API_URL=http://127.0.0.1:8765/api/v1/misc/execute python3 download_dev_table_data.py
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from recordings import recording_path
+
+EXECUTE_PATH = "/api/v1/misc/execute"
+
+TABLE_LIST_RE = re.compile(r"FROM\s+information_schema\.tables", re.I)
+COLUMNS_RE = re.compile(r"FROM\s+INFORMATION_SCHEMA\.COLUMNS.*TABLE_NAME\s*=\s*'(\w+)'", re.I | re.S)
+SELECT_RE = re.compile(
+    r"^\s*SELECT\s+\*\s+FROM\s+`?(?P<table>\w+)`?"
+    r"(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>[`\w\s,]+?))?"
+    r"(?:\s+LIMIT\s+(?P<limit>\d+)(?:\s+OFFSET\s+(?P<offset>\d+))?)?\s*;?\s*$",
+    re.I | re.S,
+)
+SHOW_CREATE_RE = re.compile(r"^\s*SHOW\s+CREATE\s+TABLE\s+`?(\w+)`?", re.I)
+MIN_MAX_RE = re.compile(r"^\s*SELECT\s+MIN\(`?(\w+)`?\)\s+AS\s+lo,\s*MAX\(`?\w+`?\)\s+AS\s+hi\s+FROM\s+`?(\w+)`?", re.I)
+CONDITION_RE = re.compile(r"`?(\w+)`?\s*(>=|<=|>|<|=)\s*(-?\d+)")
+COMPARE = {
+    ">": lambda a, b: a > b, ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b, "<=": lambda a, b: a <= b, "=": lambda a, b: a == b,
+}
+
+
+class DumpStore:
+    """Lazily loaded, cached view of the tables in a dump directory."""
+
+    def __init__(self, dump_dir):
+        self.dump_dir = dump_dir
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def table_names(self):
+        suffix = "_dump.json"
+        return sorted(name[:-len(suffix)] for name in os.listdir(self.dump_dir) if name.endswith(suffix))
+
+    def rows(self, table):
+        with self._lock:
+            if table not in self._tables:
+                path = os.path.join(self.dump_dir, f"{table}_dump.json")
+                if not os.path.exists(path):
+                    raise KeyError(f"Table '{table}' doesn't exist")
+                with open(path, encoding="utf-8") as f:
+                    self._tables[table] = json.load(f)
+            return self._tables[table]
+
+    def columns(self, table):
+        """information_schema-style column rows; `id` is reported as the integer primary key."""
+        rows = self.rows(table)
+        if not rows:
+            return []
+        return [
+            {
+                "COLUMN_NAME": col,
+                "COLUMN_KEY": "PRI" if col == "id" else "",
+                "DATA_TYPE": "int" if isinstance(rows[0][col], int) else "varchar",
+            }
+            for col in rows[0]
+        ]
+
+    def create_table(self, table):
+        columns = self.columns(table)
+        if not columns:
+            raise KeyError(f"Table '{table}' doesn't exist")
+        lines = [f"  `{c['COLUMN_NAME']}` {'int' if c['DATA_TYPE'] == 'int' else 'varchar(255)'} DEFAULT NULL"
+                 for c in columns]
+        lines += [f"  PRIMARY KEY (`{c['COLUMN_NAME']}`)" for c in columns if c["COLUMN_KEY"] == "PRI"]
+        body = ",\n".join(lines)
+        return f"CREATE TABLE `{table}` (\n{body}\n) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+
+    def select(self, match):
+        rows = self.rows(match.group("table"))
+        for column, op, value in CONDITION_RE.findall(match.group("where") or ""):
+            rows = [row for row in rows if row.get(column) is not None and COMPARE[op](row[column], int(value))]
+        if match.group("order"):
+            keys = [key.strip(" `") for key in match.group("order").split(",")]
+            # NULLs first, as in MySQL
+            rows = sorted(rows, key=lambda row: tuple((row.get(key) is not None, row.get(key)) for key in keys))
+        offset = int(match.group("offset") or 0)
+        if match.group("limit"):
+            return rows[offset:offset + int(match.group("limit"))]
+        return rows[offset:]
+
+
+def answer(store, query):
+    """Return the response payload for one query."""
+    try:
+        if TABLE_LIST_RE.search(query):
+            data = [{"table_name": t, "table_rows": len(store.rows(t))} for t in store.table_names()]
+        elif COLUMNS_RE.search(query):
+            table = COLUMNS_RE.search(query).group(1)
+            data = store.columns(table)
+        elif SHOW_CREATE_RE.match(query):
+            table = SHOW_CREATE_RE.match(query).group(1)
+            data = [{"Table": table, "Create Table": store.create_table(table)}]
+        elif MIN_MAX_RE.match(query):
+            column, table = MIN_MAX_RE.match(query).groups()
+            ids = [row[column] for row in store.rows(table) if row.get(column) is not None]
+            data = [{"lo": min(ids, default=None), "hi": max(ids, default=None)}]
+        elif SELECT_RE.match(query):
+            data = store.select(SELECT_RE.match(query))
+        else:
+            raise ValueError(f"Unsupported query: {query.strip()[:80]}")
+    except (KeyError, ValueError) as e:
+        return {"data": {"success": False}, "error": {"message": str(e).strip("'\"")}}
+    return {"data": {"success": True, "data": data}}
+
+
+class StubOptions:
+    def __init__(self, latency=0.0, jitter=0.0, fail_rate=0.0, fail_status=503,
+                 stall_rate=0.0, stall_seconds=60.0, recordings=None, seed=None, fail_first=0, retry_after=None):
+        self.latency = latency              # seconds added to every response
+        self.jitter = jitter                # ± uniform seconds on top of latency
+        self.fail_rate = fail_rate          # fraction of requests answered with fail_status
+        self.fail_status = fail_status
+        self.stall_rate = stall_rate        # fraction of requests held for stall_seconds
+        self.stall_seconds = stall_seconds
+        self.recordings = recordings
+        self.random = random.Random(seed)
+        self.fail_first = fail_first        # the first N requests always fail, for deterministic retry tests
+        self.retry_after = retry_after      # Retry-After header sent with injected failures
+
+
+class StubStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.failures = 0
+        self.bytes_sent = 0
+        self.gzipped = 0
+        self.connections = 0
+        self.received = 0
+
+    def add(self, failed=False, nbytes=0, gzipped=False):
+        with self.lock:
+            self.requests += 1
+            self.failures += failed
+            self.bytes_sent += nbytes
+            self.gzipped += gzipped
+
+    def receive(self):
+        """Count an incoming request and return its 0-based ordinal."""
+        with self.lock:
+            self.received += 1
+            return self.received - 1
+
+    def connected(self):
+        with self.lock:
+            self.connections += 1
+
+
+def recorded_body(options, query):
+    if not options.recordings:
+        return None
+    path = recording_path(options.recordings, query)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def make_handler(store, options, stats):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive
+
+        def setup(self):
+            super().setup()
+            stats.connected()
+
+        def do_POST(self):
+            if self.path != EXECUTE_PATH:
+                self.send_error(404)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length) or b"{}").get("query", "")
+            ordinal = stats.receive()
+
+            delay = options.latency + options.random.uniform(-options.jitter, options.jitter)
+            if options.random.random() < options.stall_rate:
+                delay = options.stall_seconds
+            time.sleep(max(0.0, delay))
+            if ordinal < options.fail_first or options.random.random() < options.fail_rate:
+                stats.add(failed=True)
+                self.send_failure()
+                return
+
+            body = recorded_body(options, query)
+            if body is None:
+                body = json.dumps(answer(store, query), ensure_ascii=False, default=str).encode("utf-8")
+            self.send_body(200, body)
+
+        def send_failure(self):
+            body = f"injected failure ({options.fail_status})".encode("utf-8")
+            self.send_response(options.fail_status)
+            if options.retry_after is not None:
+                self.send_header("Retry-After", str(options.retry_after))
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_body(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+            if gzipped:
+                body = gzip.compress(body, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            stats.add(nbytes=len(body), gzipped=gzipped)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def serve(dump_dir, host="127.0.0.1", port=8765, **options):
+    """
+    Start the stub on a background thread and return the server (port=0 picks a free port).
+    Keyword options are StubOptions fields; request/byte counters are on `server.stats`.
+    """
+    stats = StubStats()
+    server = ThreadingHTTPServer((host, port), make_handler(DumpStore(dump_dir), StubOptions(**options), stats))
+    server.daemon_threads = True
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dump-dir", default="dev-db-data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", help="directory of recorded responses (DEV_API_RECORD_DIR)")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--fail-status", type=int, default=503)
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="fraction of requests held for --stall-seconds")
+    parser.add_argument("--stall-seconds", type=float, default=60.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--fail-first", type=int, default=0, help="fail the first N requests")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected failures")
+    args = parser.parse_args()
+    options = StubOptions(args.latency, args.jitter, args.fail_rate, args.fail_status,
+                          args.stall_rate, args.stall_seconds, args.recordings, args.seed,
+                          args.fail_first, args.retry_after)
+    httpd = ThreadingHTTPServer((args.host, args.port), make_handler(DumpStore(args.dump_dir), options, StubStats()))
+    print(f"🧪 Dev API stub serving {args.dump_dir} on http://{args.host}:{args.port}{EXECUTE_PATH}")
+    httpd.serve_forever()
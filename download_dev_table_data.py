@@ -1,16 +1,33 @@
-
 import os
+import glob
 import json
-import requests
-import time
+import asyncio
 import logging
+import time
+
+import metrics
+from manifest import merge_manifest, schema_fingerprint, write_json_atomic
+from progress import NULL_PROGRESS, Progress
+from schema_sync import INTEGER_TYPES
+from dev_api_client import DevApiClient, DevApiError, DevApiTimeout
 
 # === CONFIGURATION ===
-API_URL = "https://cms-bike-backend.qac24svc.dev/api/v1/misc/execute"
+API_URL = os.getenv("DEV_API_URL", "https://cms-bike-backend.qac24svc.dev/api/v1/misc/execute")
 AUTH_TOKEN = "<your_actual_token_here>"
 LOG_FILE = "db_dump_log.log"
 TARGET_SCHEMA = "cms_bike_backend_qa"
 OUTPUT_DIR = "dev-db-data"
+CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", 4))   # tables / queries in flight
+PAGE_TIMEOUT = 30                 # seconds allowed for one page before it is split
+PAGE_LATENCY_TARGET = 5.0         # seconds per page the page size is tuned towards
+PAGE_SIZE_INITIAL = 5000
+PAGE_SIZE_MIN = 50
+PAGE_SIZE_MAX = 100000
+PAGE_MAX_BYTES = 32 * 1024 * 1024
+PARTITION_ROW_THRESHOLD = 500000   # estimated rows above which a table is exported in id ranges
+EXPORT_PARTITIONS = int(os.getenv("EXPORT_PARTITIONS", 4))
+SCHEMA_CACHE_FILE = "schema_cache.json"   # columns + SHOW CREATE TABLE per table, used by the restore pre-flight
+PROGRESS = NULL_PROGRESS
 HEADERS = {
     "Content-Type": "application/json",
     "Authorization": f"Bearer {AUTH_TOKEN}"
@@ -21,49 +38,92 @@ def setup_output_directory():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # === LOGGING SETUP ===
-logging.basicConfig(
-    filename=LOG_FILE,
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-    filemode='a'
-)
+def setup_logging():
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        filemode='a'
+    )
 
 
 # === API CALLS ===
-def execute_query(query, timeout=30):
-    response = requests.post(API_URL, headers=HEADERS, json={"query": query}, timeout=timeout)
-    response.raise_for_status()
-    return response.json()
+async def execute_query(client, query, timeout=30):
+    return await client.execute(query, timeout=timeout)
 
 # === TABLE OPERATIONS ===
-def get_table_names():
+async def get_table_names(client):
     query = f"""
         SELECT table_name
         FROM information_schema.tables
         WHERE table_schema = '{TARGET_SCHEMA}' AND table_type = 'BASE TABLE';
     """
-    result = execute_query(query)
+    result = await execute_query(client, query)
     if result.get("data", {}).get("success"):
         return [row["table_name"] for row in result["data"]["data"]]
     raise Exception("Failed to fetch table list")
 
-def fetch_actual_columns(table_name):
+async def fetch_row_estimates(client):
+    """information_schema row estimates per table (cheap, approximate)."""
+    query = f"""
+        SELECT table_name, table_rows
+        FROM information_schema.tables
+        WHERE table_schema = '{TARGET_SCHEMA}' AND table_type = 'BASE TABLE';
+    """
+    try:
+        result = await execute_query(client, query)
+        rows = result.get("data", {}).get("data", [])
+        estimates = {}
+        for row in rows:
+            row = {key.lower(): value for key, value in row.items()}
+            estimates[row["table_name"]] = int(row.get("table_rows") or 0)
+        return estimates
+    except Exception as e:
+        logging.error(f"❗ Failed to fetch row estimates: {e}")
+        return {}
+
+async def fetch_table_schema(client, table_name):
     query = f"""
-        SELECT COLUMN_NAME
+        SELECT COLUMN_NAME, COLUMN_KEY, DATA_TYPE
         FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = '{TARGET_SCHEMA}' AND TABLE_NAME = '{table_name}';
+        WHERE TABLE_SCHEMA = '{TARGET_SCHEMA}' AND TABLE_NAME = '{table_name}'
+        ORDER BY ORDINAL_POSITION;
     """
     try:
-        result = execute_query(query, timeout=20)
+        result = await execute_query(client, query, timeout=20)
         rows = result.get("data", {}).get("data", [])
         if not rows:
             raise ValueError(f"❌ Schema query returned empty for table: {table_name}")
-        return [row.get("COLUMN_NAME") or row.get("column_name") for row in rows if row.get("COLUMN_NAME") or row.get("column_name")]
+        schema = []
+        for row in rows:
+            row = {key.upper(): value for key, value in row.items()}
+            if row.get("COLUMN_NAME"):
+                schema.append({
+                    "name": row["COLUMN_NAME"],
+                    "key": row.get("COLUMN_KEY") or "",
+                    "type": (row.get("DATA_TYPE") or "").lower(),
+                })
+        return schema
     except Exception as e:
         logging.error(f"❗ Failed to fetch columns for {table_name}: {e}")
         return []
 
+async def fetch_create_table(client, table_name):
+    try:
+        result = await execute_query(client, f"SHOW CREATE TABLE `{table_name}`;", timeout=20)
+        rows = result.get("data", {}).get("data", [])
+        if not rows:
+            raise ValueError(result.get("error", {}).get("message", "empty result"))
+        row = {key.lower(): value for key, value in rows[0].items()}
+        return row["create table"]
+    except Exception as e:
+        logging.error(f"❗ Failed to fetch CREATE TABLE for {table_name}: {e}")
+        return None
+
+async def fetch_actual_columns(client, table_name):
+    return [col["name"] for col in await fetch_table_schema(client, table_name)]
+
 def normalize_row_keys(rows, actual_columns):
     normalized = []
     lower_col_map = {col.lower(): col for col in actual_columns}
@@ -72,60 +132,305 @@ def normalize_row_keys(rows, actual_columns):
         normalized.append(new_row)
     return normalized
 
-def dump_table_to_json(table_name):
-    query = f"SELECT * FROM {table_name};"
+def normalize_rows_timed(rows, actual_columns, stats):
+    started = time.perf_counter()
+    normalized = normalize_row_keys(rows, actual_columns)
+    stats["normalise_seconds"] += time.perf_counter() - started
+    return normalized
+
+def write_dump(out_file, rows):
+    """Write a dump atomically; returns its manifest file entry (name, bytes, sha256)."""
+    return write_json_atomic(out_file, rows)
+
+def shard_file(table_name, part):
+    return os.path.join(OUTPUT_DIR, f"{table_name}_dump.part-{part:03d}.json")
+
+def remove_stale_dumps(table_name, keep):
+    """Delete dump files of a previous run (single file or shards) that this run didn't write."""
+    candidates = glob.glob(os.path.join(OUTPUT_DIR, f"{table_name}_dump.part-*.json"))
+    candidates.append(os.path.join(OUTPUT_DIR, f"{table_name}_dump.json"))
+    for path in candidates:
+        if path not in keep and os.path.exists(path):
+            os.remove(path)
+
+# === ADAPTIVE PAGING ===
+class PageSizer:
+    """Grows or shrinks the page size so each page takes about PAGE_LATENCY_TARGET seconds."""
+
+    def __init__(self, size=PAGE_SIZE_INITIAL, minimum=PAGE_SIZE_MIN, maximum=PAGE_SIZE_MAX,
+                 target_seconds=PAGE_LATENCY_TARGET, max_bytes=PAGE_MAX_BYTES):
+        self.size = size
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.max_bytes = max_bytes
+
+    def observe(self, rows, seconds, nbytes):
+        if not rows:
+            return
+        by_latency = self.size * self.target_seconds / max(seconds, 0.05)
+        by_payload = self.max_bytes / max(nbytes / rows, 1)
+        # At most double or halve per page so one slow response doesn't whipsaw the size.
+        proposed = min(by_latency, by_payload, self.size * 2)
+        self.size = int(max(self.minimum, self.size / 2, min(proposed, self.maximum)))
+
+    def split(self):
+        """Halve the page size after a timeout. Returns False if it can't shrink any further."""
+        if self.size <= self.minimum:
+            return False
+        self.size = max(self.minimum, self.size // 2)
+        return True
+
+def keyset_column(schema):
+    """The single integer primary key column, if the table has one (enables WHERE pk > last paging)."""
+    pk = [col for col in schema if col["key"] == "PRI"]
+    if len(pk) == 1 and pk[0]["type"] in INTEGER_TYPES:
+        return pk[0]["name"]
+    return None
+
+def page_query(table_name, schema, limit, after=None, offset=0, upper=None):
+    pk = keyset_column(schema)
+    if pk:
+        conditions = []
+        if after is not None:
+            conditions.append(f"`{pk}` > {after}")
+        if upper is not None:
+            conditions.append(f"`{pk}` <= {upper}")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT * FROM `{table_name}`{where} ORDER BY `{pk}` LIMIT {limit};"
+    # OFFSET paging needs a total order or pages overlap / skip rows. Without a primary key, sort on every
+    # column: rows that still tie are identical, so whichever copy lands on a page the dump is the same.
+    order_columns = [col for col in schema if col["key"] == "PRI"] or schema
+    order_by = ", ".join(f"`{col['name']}`" for col in order_columns)
+    return f"SELECT * FROM `{table_name}` ORDER BY {order_by} LIMIT {limit} OFFSET {offset};"
+
+def row_value(row, column):
+    if column in row:
+        return row[column]
+    lower = column.lower()
+    return next(value for key, value in row.items() if key.lower() == lower)
+
+async def fetch_table_rows(client, table_name, schema, lower=None, upper=None, stats=None):
+    """
+    Fetch all rows page by page, adapting the page size and splitting pages that time out.
+    `lower` (exclusive) / `upper` (inclusive) restrict keyset paging to one id range.
+    Request, byte and timeout counts are added to `stats` when given.
+    """
+    stats = stats if stats is not None else new_download_stats()
+    pk = keyset_column(schema)
+    sizer = PageSizer()
+    rows, after = [], lower
+    while True:
+        limit = sizer.size
+        query = page_query(table_name, schema, limit, after=after, offset=len(rows), upper=upper)
+        started = time.monotonic()
+        stats["requests"] += 1
+        try:
+            result, nbytes = await client.execute_with_size(query, timeout=PAGE_TIMEOUT, retry_timeouts=False)
+        except DevApiTimeout:
+            stats["timeouts"] += 1
+            if not sizer.split():
+                raise
+            logging.warning(f"⏱️ Page of {limit} rows from {table_name} timed out, retrying with {sizer.size}")
+            continue
+        if not result.get("data", {}).get("success"):
+            raise DevApiError(result.get("error", {}).get("message", "Unknown error"))
+        page = result["data"]["data"]
+        stats["bytes"] += nbytes
+        sizer.observe(len(page), time.monotonic() - started, nbytes)
+        rows.extend(page)
+        PROGRESS.advance(table_name, len(page))
+        if len(page) < limit:
+            return rows
+        if pk:
+            after = row_value(page[-1], pk)
+
+# === RANGE-PARTITIONED EXPORT ===
+async def fetch_id_bounds(client, table_name, pk):
+    result = await execute_query(client, f"SELECT MIN(`{pk}`) AS lo, MAX(`{pk}`) AS hi FROM `{table_name}`;")
+    if not result.get("data", {}).get("success"):
+        raise DevApiError(result.get("error", {}).get("message", "Unknown error"))
+    row = {key.lower(): value for key, value in result["data"]["data"][0].items()}
+    if row["lo"] is None:
+        return None
+    return int(row["lo"]), int(row["hi"])
+
+def split_id_range(lo, hi, parts):
+    """Split [lo, hi] into up to `parts` disjoint (lower-exclusive, upper-inclusive] ranges."""
+    step = max(1, -(-(hi - lo + 1) // parts))
+    bounds = []
+    lower = lo - 1
+    while lower < hi:
+        upper = min(hi, lower + step)
+        bounds.append((lower, upper))
+        lower = upper
+    return bounds
+
+async def dump_partitioned(client, table_name, schema, pk, stats):
+    """Fetch disjoint id ranges concurrently, each into its own shard file. Returns (rows written, file entries)."""
+    bounds = await fetch_id_bounds(client, table_name, pk)
+    if bounds is None:
+        return 0, []
+    columns = [col["name"] for col in schema]
+    ranges = split_id_range(*bounds, EXPORT_PARTITIONS)
+    logging.info(f"🧩 Exporting {table_name} in {len(ranges)} id ranges")
+
+    async def export_range(part, lower, upper):
+        rows = await fetch_table_rows(client, table_name, schema, lower=lower, upper=upper, stats=stats)
+        out_file = shard_file(table_name, part)
+        entry = await asyncio.to_thread(write_dump, out_file, normalize_rows_timed(rows, columns, stats))
+        return out_file, entry, len(rows)
+
+    shards = await asyncio.gather(*(export_range(part, lower, upper) for part, (lower, upper) in enumerate(ranges)))
+    remove_stale_dumps(table_name, keep={out_file for out_file, _, _ in shards})
+    return sum(count for _, _, count in shards), [entry for _, entry, _ in shards]
+
+def new_download_stats():
+    return {"requests": 0, "bytes": 0, "timeouts": 0, "normalise_seconds": 0.0}
+
+async def dump_table_to_json(client, table_name, row_estimate=0, schema_cache=None):
     logging.info(f"⤵️ Downloading data from : {table_name}")
-    print(f"⤵️ Downloading started for : {table_name}", end=" ")
+    print(f"⤵️ Downloading started for : {table_name}")
+    stats = new_download_stats()
+    PROGRESS.start(table_name)
+    with metrics.timed("download", table_name) as m:
+        m["status"] = "failed"
+        entry = await export_table(client, table_name, row_estimate, stats, schema_cache)
+        if entry is not None:
+            m["status"] = "ok"
+            m["rows"] = entry["rows"]
+        m.update(requests=stats["requests"], bytes=stats["bytes"], timeouts=stats["timeouts"])
+    metrics.emit("normalise", table_name, seconds=round(stats["normalise_seconds"], 4), rows=m.get("rows", 0))
+    PROGRESS.finish(table_name)
+    return entry
+
+async def export_table(client, table_name, row_estimate, stats, schema_cache=None):
+    """
+    Download one table into its dump file(s). Returns the table's manifest entry
+    ({"rows", "files", "schema"}), or None on failure.
+    The table's columns and CREATE TABLE statement are added to `schema_cache` when given.
+    """
     try:
-        result = execute_query(query)
-        if result.get("data", {}).get("success"):
-            rows = result["data"]["data"]
-            if not rows:
+        stats["requests"] += 2
+        schema, create_table = await asyncio.gather(fetch_table_schema(client, table_name),
+                                                    fetch_create_table(client, table_name))
+        if not schema:
+            logging.warning(f"⚠️ Skipping {table_name} due to missing schema info.")
+            return None
+        if schema_cache is not None:
+            schema_cache[table_name] = {"columns": schema, "create_table": create_table}
+        empty = {"rows": 0, "files": [], "schema": schema_fingerprint(schema)}
+        pk = keyset_column(schema)
+        if pk and EXPORT_PARTITIONS > 1 and row_estimate >= PARTITION_ROW_THRESHOLD:
+            rows_written, files = await dump_partitioned(client, table_name, schema, pk, stats)
+            if not rows_written:
                 logging.warning(f"⚠️  Empty table: {table_name}")
-                return
-            actual_columns = fetch_actual_columns(table_name)
-            if not actual_columns:
-                logging.warning(f"⚠️ Skipping {table_name} due to missing schema info.")
-                return
-            normalized_rows = normalize_row_keys(rows, actual_columns)
-            out_file = os.path.join(OUTPUT_DIR, f"{table_name}_dump.json")
-            with open(out_file, "w", encoding="utf-8") as f:
-                json.dump(normalized_rows, f, indent=2, ensure_ascii=False)
-            logging.info(f"✅ Saved: {out_file}")
+                remove_stale_dumps(table_name, keep=set())
+                return empty
+            logging.info(f"✅ Saved shards: {table_name}")
             print(f"   Downloaded : {table_name}", end="  ✅️\n")
-
-        else:
-            error_msg = result.get("error", {}).get("message", "Unknown error")
-            print(f"   Downlaod failed : {table_name},  API Error: {error_msg} : ", end="  ❌\n")
-            logging.error(f"❌ API Error: {error_msg}")
+            return {**empty, "rows": rows_written, "files": files}
+        rows = await fetch_table_rows(client, table_name, schema, stats=stats)
+        if not rows:
+            logging.warning(f"⚠️  Empty table: {table_name}")
+            remove_stale_dumps(table_name, keep=set())
+            return empty
+        normalized_rows = normalize_rows_timed(rows, [col["name"] for col in schema], stats)
+        out_file = os.path.join(OUTPUT_DIR, f"{table_name}_dump.json")
+        file_entry = await asyncio.to_thread(write_dump, out_file, normalized_rows)
+        remove_stale_dumps(table_name, keep={out_file})
+        logging.info(f"✅ Saved: {out_file}")
+        print(f"   Downloaded : {table_name}", end="  ✅️\n")
+        return {**empty, "rows": len(rows), "files": [file_entry]}
+    except DevApiError as e:
+        print(f"   Downlaod failed : {table_name},  API Error: {e} : ", end="  ❌\n")
+        logging.error(f"❌ API Error for {table_name}: {e}")
     except Exception as e:
         logging.error(f"❗ Failed to query {table_name}: {e}")
         print(f"❗ Failed to download {table_name}, ERROR: {e}", end="  ❌\n")
+    return None
+
+def merge_into_json_file(file_name, entries):
+    """Merge this run's per-table entries into a JSON object file in OUTPUT_DIR."""
+    path = os.path.join(OUTPUT_DIR, file_name)
+    existing = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            existing = json.load(f)
+    existing.update(entries)
+    write_json_atomic(path, existing, sort_keys=True)
+
+async def download_tables(client, tables, row_estimates=None):
+    """
+    Download `tables` with CONCURRENCY workers.
+    Returns ({table: manifest entry} for the successful ones, {table: schema cache entry}).
+    """
+    row_estimates = row_estimates or {}
+    manifest = {}
+    schema_cache = {}
+    queue = asyncio.Queue()
+    # Biggest tables first, so they don't start last and hold up the end of the run.
+    for table in sorted(tables, key=lambda t: -row_estimates.get(t, 0)):
+        queue.put_nowait(table)
+
+    async def worker():
+        while not queue.empty():
+            table = queue.get_nowait()
+            entry = await dump_table_to_json(client, table, row_estimates.get(table, 0), schema_cache)
+            if entry is not None:
+                manifest[table] = entry
+
+    await asyncio.gather(*(worker() for _ in range(min(CONCURRENCY, len(tables)) or 1)))
+    return manifest, schema_cache
 
 # === MAIN EXECUTION ===
-def main():
+async def main_async(only=None):
+    """Download every table, or just the tables named in `only`; returns the manifest entries written."""
+    global PROGRESS
+    async with DevApiClient(API_URL, HEADERS, concurrency=CONCURRENCY) as client:
+        tables = await get_table_names(client)
+        logging.info(f"🔍 Found {len(tables)} tables in schema '{TARGET_SCHEMA}'")
+        if only is not None:
+            missing = sorted(set(only) - set(tables))
+            if missing:
+                logging.warning(f"⚠️ Not on dev: {', '.join(missing)}")
+            tables = [t for t in tables if t in only]
+        row_estimates = await fetch_row_estimates(client)
+        PROGRESS = Progress("⤵️ download", totals={t: row_estimates.get(t, 0) for t in tables})
+        try:
+            manifest, schema_cache = await download_tables(client, tables, row_estimates)
+        finally:
+            PROGRESS.close()
+            PROGRESS = NULL_PROGRESS
+        # Tables that failed keep their previous entry (and files), so the restore still sees a consistent pair.
+        merge_manifest(OUTPUT_DIR, manifest)
+        merge_into_json_file(SCHEMA_CACHE_FILE, schema_cache)
+        return manifest
+
+def main(only=None):
+    setup_logging()
     setup_output_directory()
     try:
-        tables = get_table_names()
-        logging.info(f"🔍 Found {len(tables)} tables in schema '{TARGET_SCHEMA}'")
-        for table in tables:
-            dump_table_to_json(table)
-            time.sleep(0.3)
+        return asyncio.run(main_async(only))
     except KeyboardInterrupt:
         logging.warning("🛑 Interrupted by user.")
     except Exception as e:
         logging.error(f"❗ Fatal error: {e}")
 
 # === EXTERNAL HOOK ===
-def download_db_data_from_dev(bearer_token, log_file):
+def download_db_data_from_dev(bearer_token, log_file, only=None):
     global AUTH_TOKEN, HEADERS, LOG_FILE
     if bearer_token:
         AUTH_TOKEN = bearer_token
         LOG_FILE = log_file
         HEADERS["Authorization"] = f"Bearer {AUTH_TOKEN}"
     print("✅ Downloading started. For details check `db_clone_log` file. ")
-    main()
-    print("✅ Tables data downloaded successfully.")
+    manifest = main(only)
+    if manifest is None:
+        print(f"❌ Download failed, see `{LOG_FILE}`.")
+    else:
+        print(f"✅ Tables data downloaded successfully ({len(manifest)} tables).")
+    return manifest
 # === SCRIPT ENTRY ===
 if __name__ == "__main__":
     main()
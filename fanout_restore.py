@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+fanout_restore.py – Restore one dev snapshot into several databases at once.
+
+Instead of running `clean_and_restore` once per target (re-parsing every dump
+each time), the dumps are parsed and normalised once, in INSERT_ORDER, and
+every prepared batch is handed to one writer thread per target.  Each writer
+has its own connection, its own bounded queue, its own schema reconciliation
+and wipe, and its own rejects directory (`rejects/<target>/`), so one slow or
+broken target never corrupts another's accounting; the parser only waits when
+the slowest target's queue is full.
+
+    python3 fanout_restore.py targets.json
+
+targets.json is a list of CONFIG overrides; missing keys come from
+clean_up_local_db.CONFIG:
+
+    [{"name": "alice", "database": "cms_alice"},
+     {"name": "ci", "host": "10.0.0.5", "database": "cms_ci"}]
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import pymysql
+
+import clean_up_local_db as restore
+import metrics
+from progress import Progress
+from rejects import REJECTS_DIR, TARGET_FILE, RejectSink
+from schema_sync import load_schema_cache, reconcile_schema
+
+QUEUE_BATCHES = 64   # batches buffered per target before the parser waits for it
+_DONE = object()
+
+
+def target_config(spec):
+    """(name, connection config) of one targets.json entry."""
+    config = {**restore.CONFIG, **{k: v for k, v in spec.items() if k != "name"}}
+    return spec.get("name") or config["database"], config
+
+
+class Target:
+    def __init__(self, spec, schema_cache, progress):
+        self.name, self.config = target_config(spec)
+        self.rejects = RejectSink(os.path.join(REJECTS_DIR, self.name))
+        self.queue = queue.Queue(maxsize=QUEUE_BATCHES)
+        self.schema_cache = schema_cache
+        self.progress = progress
+        self.allowed = {}
+        self.skipped = set(restore.SKIPPED_TABLES)   # bad dumps, for every target; plus this target's own
+        self.inserted = 0
+        self.failed = 0
+        self.error = None
+        self._tables = {}   # table → insert metrics of the table being loaded
+        self._thread = threading.Thread(target=self._run, name=f"fanout-{self.name}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def put(self, message):
+        self.queue.put(message)
+
+    def join(self):
+        self.queue.put(_DONE)
+        self._thread.join()
+
+    # ---- writer thread ----
+    def _run(self):
+        try:
+            self._prepare()
+            with restore.get_connection(self.config) as conn:
+                with conn.cursor() as cursor:
+                    while (message := self.queue.get()) is not _DONE:
+                        self._handle(cursor, *message)
+        except Exception as e:
+            self.error = e
+            logging.error(f"❌ [{self.name}] restore aborted: {e}")
+            while self.queue.get() is not _DONE:   # keep draining so the parser never blocks on us
+                pass
+
+    def _prepare(self):
+        if restore.SCHEMA_SYNC != "off" and self.schema_cache:
+            with restore.get_connection(self.config) as conn:
+                self.allowed, unusable = reconcile_schema(conn, self.config["database"], self.schema_cache,
+                                                          restore.INSERT_ORDER, restore.SCHEMA_SYNC)
+            self.skipped.update(unusable)
+        self.rejects.clear(restore.INSERT_ORDER)
+        # Marks the directory as this target's, so a replay is pointed at the target DB, not the local one.
+        os.makedirs(self.rejects.directory, exist_ok=True)
+        with open(os.path.join(self.rejects.directory, TARGET_FILE), "w", encoding="utf-8") as f:
+            json.dump({"name": self.name, "database": self.config["database"]}, f)
+        restore.delete_all_data_in_order(self.config, self.skipped)
+
+    def _handle(self, cursor, kind, table, columns, rows):
+        if table in self.skipped:
+            return
+        m = self._tables.setdefault(table, {"started": time.perf_counter(), "rows": 0, "failed": 0, "round_trips": 0})
+        if kind == "insert":
+            columns, rows = self._project(table, columns, rows)
+            sql = restore.build_insert_sql(table, columns)
+            for values in rows:
+                m["round_trips"] += 1
+                try:
+                    cursor.execute(sql, values)
+                except pymysql.MySQLError as e:
+                    m["failed"] += 1
+                    self.rejects.reject(table, columns, values, e)
+            m["rows"] += len(rows)
+            self.progress.advance(table, len(rows))
+        elif kind == "update":
+            column = columns
+            for row_id, value in rows:
+                m["round_trips"] += 1
+                try:
+                    cursor.execute(f"UPDATE `{table}` SET `{column}`=%s WHERE id=%s", (value, row_id))
+                except pymysql.MySQLError as e:
+                    m["failed"] += 1
+                    self.rejects.reject(table, ("id", column), (row_id, value), e, op="update")
+        elif kind == "end":
+            m = self._tables.pop(table)
+            seconds = time.perf_counter() - m.pop("started")
+            self.inserted += m["rows"] - m["failed"]
+            self.failed += m["failed"]
+            metrics.emit("insert", table, target=self.name, seconds=round(seconds, 4),
+                         rows_per_s=round(m["rows"] / seconds, 1) if seconds else None, **m)
+
+    def _project(self, table, columns, rows):
+        """Drop the columns this target does not have (SCHEMA_SYNC=drop or a failed ALTER)."""
+        allowed = self.allowed.get(table)
+        if allowed is None or all(col in allowed for col in columns):
+            return columns, rows
+        keep = [i for i, col in enumerate(columns) if col in allowed]
+        return [columns[i] for i in keep], [tuple(values[i] for i in keep) for values in rows]
+
+
+# ---- PARSER (main thread) ----
+def broadcast(targets, message):
+    for target in targets:
+        if target.error is None:
+            target.put(message)
+
+
+def stream_table(table, targets):
+    """Parse the table's dump file(s) once and hand every batch to all targets."""
+    updates = {}
+    for file_path in restore.dump_files(table):
+        data = restore.load_table_rows(table, file_path)
+        if not data:
+            continue
+        for _, batch in data.chunks(restore.BATCH_SIZE):
+            broadcast(targets, ("insert", table, data.columns, batch))
+        for column, values in data.deferred.items():
+            updates.setdefault(column, []).extend(
+                (row_id, value) for row_id, value in zip(data.column("id"), values) if value)
+    # Self-references are written once every shard's rows exist.
+    for column, pairs in updates.items():
+        for start in range(0, len(pairs), restore.BATCH_SIZE):
+            broadcast(targets, ("update", table, column, pairs[start:start + restore.BATCH_SIZE]))
+    broadcast(targets, ("end", table, None, None))
+
+
+def fanout_restore(target_specs, LOG_FILE="db_clone_log.logs"):
+    """Restore DUMP_DIR into every target of `target_specs`; returns {target name: (inserted, failed, error)}."""
+    logging.basicConfig(
+        filename=LOG_FILE,
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        filemode='a'
+    )
+    restore.ALLOWED_COLUMNS.clear()   # column filtering is per target here, never at parse time
+    restore.SKIPPED_TABLES.clear()
+    restore.validate_dumps(restore.INSERT_ORDER)
+    restore.verify_insert_order(restore.INSERT_ORDER)
+    counts = restore.expected_row_counts()
+    progress = Progress("📥 fan-out", totals={t: counts[t] * len(target_specs) for t in restore.INSERT_ORDER if t in counts})
+    schema_cache = load_schema_cache(restore.DUMP_DIR)
+    targets = [Target(spec, schema_cache, progress) for spec in target_specs]
+    print(f"🔀 Restoring into {len(targets)} targets: {', '.join(t.name for t in targets)}")
+    try:
+        for target in targets:
+            target.start()
+        for table in restore.INSERT_ORDER:
+            if table in restore.SKIPPED_TABLES:
+                continue
+            logging.info(f"📥 Fanning out table: {table}")
+            stream_table(table, targets)
+    finally:
+        for target in targets:
+            target.join()
+        progress.close()
+
+    results = {}
+    for target in targets:
+        rejected = sum(target.rejects.close().values())
+        results[target.name] = (target.inserted, target.failed, target.error)
+        if target.error:
+            print(f"❌ {target.name}: aborted – {target.error}")
+        elif rejected:
+            print(f"⚠️  {target.name}: {target.inserted:,} rows, {rejected} rejected → `{target.rejects.directory}/`")
+        else:
+            print(f"✅ {target.name}: {target.inserted:,} rows restored")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", help="JSON file with the list of target DB configs")
+    args = parser.parse_args()
+    with open(args.targets, encoding="utf-8") as f:
+        specs = json.load(f)
+    metrics.start_run()
+    fanout_restore(specs)
+    metrics.print_summary()
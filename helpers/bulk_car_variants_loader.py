@@ -7,13 +7,11 @@ Bulk-insert / update JSON array into `variant_car`.
 
 import json
 import os
+import sys
+from functools import lru_cache, partial
 from pathlib import Path
 from typing import *
 
-from dateutil import parser as dt_parser
-import mysql.connector
-from mysql.connector import errorcode
-
 # ──────────────────────────────────────────────────────────────────────────────
 # 1️⃣  DB config  – override with ENV vars if you like
 # ──────────────────────────────────────────────────────────────────────────────
@@ -29,12 +27,18 @@ JSON_FILE   = "car_variants_dump.json"   # your file here
 DISABLE_FK  = True                   # set False in prod if you want FK enforced
 
 
+@lru_cache(maxsize=None)
+def date_parser():
+    from dateutil import parser   # imported on first use, once
+    return parser
+
+
 def iso_to_mysql(val: Optional[str]) -> Optional[str]:
     """Convert ISO 8601 → 'YYYY-MM-DD HH:MM:SS'.  Return unchanged on failure."""
     if not val:
         return None
     try:
-        dt = dt_parser.isoparse(val)
+        dt = date_parser().isoparse(val)
         return dt.astimezone(tz=None).replace(tzinfo=None).strftime("%Y-%m-%d %H:%M:%S")
     except Exception:  # ValueError, TypeError
         return val  # leave plain time / invalid strings untouched
@@ -78,8 +82,12 @@ def normalise_row(js: dict, columns: list[str]) -> tuple:
 # ──────────────────────────────────────────────────────────────────────────────
 # 3️⃣  Main bulk loader
 # ──────────────────────────────────────────────────────────────────────────────
-def main() -> None:
-    variants = load_json(JSON_FILE)
+def main(json_file: Optional[Union[str, Path]] = None) -> None:
+    import mysql.connector
+    from mysql.connector import errorcode
+    from normalise_pool import iter_normalised
+
+    variants = load_json(json_file or JSON_FILE)
 
     conn = mysql.connector.connect(**CONFIG)
     cur  = conn.cursor()
@@ -100,8 +108,8 @@ def main() -> None:
         if DISABLE_FK:
             cur.execute("SET FOREIGN_KEY_CHECKS=0")
 
-        for js in variants:
-            data = normalise_row(js, columns)
+        # colorDetails json.dumps etc. run in NORMALISE_WORKERS processes when set
+        for data in iter_normalised(variants, partial(normalise_row, columns=columns)):
             try:
                 cur.execute(sql, data)
                 inserted += 1
@@ -126,6 +134,11 @@ def main() -> None:
     print(f"⛔ skipped (duplicate): {skipped_dup}")
 
 
+def clone_variant_car_table(table_dump_data):
+    main(table_dump_data)
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))   # for normalise_pool when run as a script
     main()
@@ -7,11 +7,10 @@ Requires:
 
 import json
 import os
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from dateutil import parser as date_parser
-import mysql.connector
-from mysql.connector import errorcode
+from typing import Iterable, Optional
 
 # ------------------------------------------------------------------------------
 # 1.  DB connection
@@ -37,11 +36,17 @@ COLUMNS = (
 # ------------------------------------------------------------------------------
 # 3.  Helpers
 # ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def date_parser():
+    from dateutil import parser   # imported on first use, once
+    return parser
+
+
 def iso_to_mysql(iso: Optional[str]) -> Optional[str]:
     """2025-03-17T22:17:17+05:30  →  2025-03-17 16:47:17"""
     if not iso:
         return None
-    dt = date_parser.isoparse(iso).astimezone(tz=None).replace(tzinfo=None)
+    dt = date_parser().isoparse(iso).astimezone(tz=None).replace(tzinfo=None)
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
@@ -76,7 +81,10 @@ def load_json(path: Path) -> list[dict]:
 # ------------------------------------------------------------------------------
 # 4.  Bulk insert / update with FK-safe skipping
 # ------------------------------------------------------------------------------
-def bulk_insert_makes(rows: list[tuple]) -> None:
+def bulk_insert_makes(rows: Iterable[tuple]) -> None:
+    import mysql.connector
+    from mysql.connector import errorcode
+
     placeholders = ", ".join(["%s"] * len(COLUMNS))
     col_list = ", ".join(f"`{c}`" for c in COLUMNS)
     update_clause = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in COLUMNS if c != "id")
@@ -115,8 +123,16 @@ def bulk_insert_makes(rows: list[tuple]) -> None:
 # ------------------------------------------------------------------------------
 # 5.  Main
 # ------------------------------------------------------------------------------
-if __name__ == "__main__":
-    json_path = Path("makes_dump.json")    # point to your JSON dump
+def clone_makes_table(table_dump_data):
+    from normalise_pool import iter_normalised
+
+    json_path = Path(table_dump_data)
     raw = load_json(json_path)
-    tuples = [normalise(js) for js in raw]
+    tuples = iter_normalised(raw, normalise)
     bulk_insert_makes(tuples)
+
+
+if __name__ == "__main__":
+    # Run as `python helpers/<loader>.py`: normalise_pool lives in the repo root.
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    clone_makes_table("makes_dump.json")    # point to your JSON dump
@@ -2,10 +2,9 @@
 
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from dateutil import parser as date_parser
-import mysql.connector
 
 # DB config (customize or load from ENV)
 CONFIG = {
@@ -19,10 +18,16 @@ CONFIG = {
 # DB columns
 COLUMNS = ("id", "name", "isActive", "createdAt", "updatedAt", "parentId", "tenantId")
 
+@lru_cache(maxsize=None)
+def date_parser():
+    from dateutil import parser   # imported on first use, once
+    return parser
+
+
 def iso_to_mysql(iso_str: Optional[str]) -> Optional[str]:
     if not iso_str:
         return None
-    dt = date_parser.isoparse(iso_str).astimezone(tz=None).replace(tzinfo=None)
+    dt = date_parser().isoparse(iso_str).astimezone(tz=None).replace(tzinfo=None)
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 def normalise_row(js: dict) -> tuple:
@@ -42,6 +47,8 @@ def load_json(path: Path) -> list[dict]:
     return blob["data"] if "data" in blob else blob
 
 def bulk_insert_folders(rows: list[tuple]) -> None:
+    import mysql.connector
+
     placeholders = ", ".join(["%s"] * len(COLUMNS))
     col_list = ", ".join(f"`{c}`" for c in COLUMNS)
     update_clause = ", ".join(
@@ -66,8 +73,11 @@ def bulk_insert_folders(rows: list[tuple]) -> None:
     finally:
         conn.close()
 
-if __name__ == "__main__":
-    json_path = Path("media_folder_dump.json")  # your JSON file
+def clone_media_folder_table(table_dump_data):
+    json_path = Path(table_dump_data)
     raw_rows = load_json(json_path)
     tuples = [normalise_row(js) for js in raw_rows]
     bulk_insert_folders(tuples)
+
+if __name__ == "__main__":
+    clone_media_folder_table("media_folder_dump.json")  # your JSON file
@@ -2,10 +2,9 @@
 
 import json
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from dateutil import parser as date_parser
-import mysql.connector
 
 # ------------------------------------------------------------------------------
 # DB connection config – pull from ENV or default to localhost
@@ -27,10 +26,16 @@ COLUMNS = (
     "category", "isHeaderImage", "colorSlug"
 )
 
+@lru_cache(maxsize=None)
+def date_parser():
+    from dateutil import parser   # imported on first use, once
+    return parser
+
+
 def iso_to_mysql(iso_str: Optional[str]) -> Optional[str]:
     if not iso_str:
         return None
-    dt = date_parser.isoparse(iso_str).astimezone(tz=None).replace(tzinfo=None)
+    dt = date_parser().isoparse(iso_str).astimezone(tz=None).replace(tzinfo=None)
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 # ------------------------------------------------------------------------------
@@ -65,6 +70,8 @@ def load_json(path: Path) -> list[dict]:
 # Bulk insert into media_library
 # ------------------------------------------------------------------------------
 def bulk_insert_media(rows: list[tuple]) -> None:
+    import mysql.connector
+
     placeholders = ", ".join(["%s"] * len(COLUMNS))
     col_list = ", ".join(f"`{c}`" for c in COLUMNS)
     update_clause = ", ".join(
@@ -92,8 +99,11 @@ def bulk_insert_media(rows: list[tuple]) -> None:
 # ------------------------------------------------------------------------------
 # Main entry point
 # ------------------------------------------------------------------------------
-if __name__ == "__main__":
-    json_path = Path("media_library_dump.json")  # JSON input
+def clone_media_library_table(table_dump_data):
+    json_path = Path(table_dump_data)
     raw_rows = load_json(json_path)
     tuples = [normalise_row(js) for js in raw_rows]
     bulk_insert_media(tuples)
+
+if __name__ == "__main__":
+    clone_media_library_table("media_library_dump.json")  # JSON input
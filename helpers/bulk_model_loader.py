@@ -8,11 +8,10 @@ Requires:
 
 import json
 import os
+import sys
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from dateutil import parser as date_parser
-import mysql.connector
-from mysql.connector import errorcode
+from typing import Iterable, Optional
 
 # ------------------------------------------------------------------------------
 # 1.  DB connection config
@@ -59,34 +58,44 @@ COLUMNS = (
 # ------------------------------------------------------------------------------
 # 3.  Utility functions
 # ------------------------------------------------------------------------------
+@lru_cache(maxsize=None)
+def date_parser():
+    from dateutil import parser   # imported on first use, once
+    return parser
+
+
 def iso_to_mysql(iso_str):
     try:
-        dt = date_parser.isoparse(iso_str)
+        dt = date_parser().isoparse(iso_str)
         return dt.astimezone(tz=None).replace(tzinfo=None).strftime('%Y-%m-%d %H:%M:%S')
     except Exception:
         return iso_str  # Return original if parsing fails
 
 
-def normalise(js):
-    js = js.copy()
-
-    date_fields = [
-        'createdat', 'updatedat', 'launcheddate',
-        'discontinueddate', 'estimatedlauncheddate'
-    ]
+DATE_COLUMNS = {
+    "createdAt", "updatedAt", "launchedDate",
+    "discontinuedDate", "estimatedLaunchedDate",
+}
 
-    for field in date_fields:
-        if field in js and js[field]:
-            js[field] = iso_to_mysql(js[field])
+# (json key, column) pairs in COLUMNS order – json keys are lowercase
+JSON_KEYS = tuple((col.lower(), col) for col in COLUMNS)
 
-    if 'keyhighlights' in js and js['keyhighlights']:
-        try:
-            js['keyhighlights'] = json.loads(js['keyhighlights'])  # Parse to list
-            js['keyhighlights'] = json.dumps(js['keyhighlights'])  # Convert back to JSON string
-        except Exception:
-            pass  # Keep as-is if invalid
 
-    return js
+def normalise(js: dict) -> tuple:
+    """Return the row as a tuple aligned to COLUMNS, without copying the dict."""
+    row = []
+    for key, col in JSON_KEYS:
+        val = js.get(key)
+        if val:
+            if col in DATE_COLUMNS:
+                val = iso_to_mysql(val)
+            elif col == "keyHighlights":
+                try:
+                    val = json.dumps(json.loads(val))  # Re-serialise to canonical JSON
+                except Exception:
+                    pass  # Keep as-is if invalid
+        row.append(val)
+    return tuple(row)
 
 
 def load_json(path: Path) -> list[dict]:
@@ -97,7 +106,10 @@ def load_json(path: Path) -> list[dict]:
 # ------------------------------------------------------------------------------
 # 4.  Bulk insert/update
 # ------------------------------------------------------------------------------
-def bulk_insert_models(rows: list[tuple]) -> None:
+def bulk_insert_models(rows: Iterable[tuple]) -> None:
+    import mysql.connector
+    from mysql.connector import errorcode
+
     placeholders = ", ".join(["%s"] * len(COLUMNS))
     col_list = ", ".join(f"`{c}`" for c in COLUMNS)
     update_clause = ", ".join(f"`{c}` = VALUES(`{c}`)" for c in COLUMNS if c != "id")
@@ -142,8 +154,15 @@ def bulk_insert_models(rows: list[tuple]) -> None:
 # ------------------------------------------------------------------------------
 # 5.  Entry Point
 # ------------------------------------------------------------------------------
-if __name__ == "__main__":
-    json_path = Path("model_dump.json")   # <- your JSON file path
+def clone_model_table(table_dump_data):
+    from normalise_pool import iter_normalised
+
+    json_path = Path(table_dump_data)
     raw = load_json(json_path)
-    tuples = [tuple(normalise(js).get(col.lower()) for col in COLUMNS) for js in raw]
+    tuples = iter_normalised(raw, normalise)   # NORMALISE_WORKERS=N to use N processes
     bulk_insert_models(tuples)
+
+
+if __name__ == "__main__":
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))   # for normalise_pool when run as a script
+    clone_model_table("model_dump.json")   # <- your JSON file path
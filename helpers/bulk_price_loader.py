@@ -6,11 +6,9 @@ Install dependency first:
 """
 
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-from dateutil import parser as date_parser  # handles 2025-05-30T21:10:41+05:30
-import mysql.connector
-from mysql.connector import errorcode
+from typing import Iterable, Optional
 
 # ------------------------------------------------------------------------------
 # 1.  Connection config – put real values (or export as ENV vars)
@@ -80,11 +78,17 @@ def normalise_row(js: dict) -> tuple:
     return tuple(row[col] for col in COLUMNS)
 
 
+@lru_cache(maxsize=None)
+def date_parser():
+    from dateutil import parser   # imported on first use, once
+    return parser
+
+
 def iso_to_mysql(iso_str: Optional[str]) -> Optional[str]:
     if not iso_str:
         return None
-    # convert to aware datetime, then to UTC naïve
-    dt = date_parser.isoparse(iso_str).astimezone(tz=None).replace(tzinfo=None)
+    # handles 2025-05-30T21:10:41+05:30: convert to aware datetime, then to UTC naïve
+    dt = date_parser().isoparse(iso_str).astimezone(tz=None).replace(tzinfo=None)
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
@@ -92,7 +96,10 @@ def iso_to_mysql(iso_str: Optional[str]) -> Optional[str]:
 # 5.  Bulk insert with ON DUPLICATE KEY UPDATE
 # ------------------------------------------------------------------------------
 
-def bulk_insert_price(rows: list[tuple]) -> None:
+def bulk_insert_price(rows: Iterable[tuple]) -> None:
+    import mysql.connector
+    from mysql.connector import errorcode
+
     placeholders = ", ".join(["%s"] * len(COLUMNS))
     col_list = ", ".join(f"`{c}`" for c in COLUMNS)
     update_clause = ", ".join(
@@ -133,9 +140,11 @@ def bulk_insert_price(rows: list[tuple]) -> None:
 # ------------------------------------------------------------------------------
 
 def clone_price_table(table_dump_data):
+    from normalise_pool import iter_normalised
+
     json_path = Path(table_dump_data)   # ✏️  change to your file
     raw_rows  = load_json(json_path)
-    tuples    = [normalise_row(js) for js in raw_rows]
+    tuples    = iter_normalised(raw_rows, normalise_row)
     bulk_insert_price(tuples)
 
 
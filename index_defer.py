@@ -0,0 +1,137 @@
+"""
+index_defer.py – Drop secondary indexes before a bulk load and rebuild them after.
+
+With every secondary index live, each inserted row updates several B-trees.
+For the tables listed in DEFER_INDEX_TABLES the restore instead:
+
+  1. reads the table's non-unique secondary indexes (KEY / FULLTEXT / SPATIAL)
+     from the local `SHOW CREATE TABLE`; PRIMARY and UNIQUE keys stay, as do
+     indexes a foreign key needs;
+  2. writes their definitions to the ledger `dev-db-data/.deferred_indexes.json`
+     (temp file + fsync + rename) – only then drops them in one ALTER TABLE;
+  3. after the load re-adds them all in a single `ALTER TABLE ... ADD INDEX ...`,
+     which InnoDB builds by sorting, and removes the table from the ledger.
+
+If a run dies in between, `recover_pending` (called at the start of every
+restore) re-adds whatever the ledger says is still missing.
+"""
+
+import json
+import logging
+import os
+import re
+
+LEDGER_FILE = ".deferred_indexes.json"
+
+INDEX_LINE_RE = re.compile(r"^\s*(?:(?:FULLTEXT|SPATIAL)\s+)?KEY\s+`(?P<name>(?:[^`]|``)+)`\s*(?P<rest>\(.*)$")
+FOREIGN_KEY_RE = re.compile(r"FOREIGN\s+KEY\s*\((?P<cols>[^)]*)\)")
+NAME_RE = re.compile(r"`((?:[^`]|``)+)`")
+
+
+def ledger_path(dump_dir):
+    return os.path.join(dump_dir, LEDGER_FILE)
+
+
+def read_ledger(dump_dir):
+    path = ledger_path(dump_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_ledger(dump_dir, ledger):
+    """Replace the ledger atomically; the rename only happens once the data is on disk."""
+    path = ledger_path(dump_dir)
+    if not ledger:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ledger, f, indent=2, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def show_create_table(cursor, table):
+    cursor.execute(f"SHOW CREATE TABLE `{table}`")
+    row = cursor.fetchone()
+    return row["Create Table"] if isinstance(row, dict) else row[1]
+
+
+def deferrable_indexes(ddl):
+    """[(name, definition)] of the non-unique secondary indexes no foreign key depends on."""
+    lines = [line.strip().rstrip(",") for line in ddl.splitlines()[1:]]
+    fk_columns = [NAME_RE.findall(m.group("cols")) for m in map(FOREIGN_KEY_RE.search, lines) if m]
+    indexes = []
+    for line in lines:
+        match = INDEX_LINE_RE.match(line)
+        if not match:
+            continue
+        columns = NAME_RE.findall(match.group("rest"))
+        if any(columns[:len(fk)] == fk for fk in fk_columns):
+            continue   # the FK needs an index with these leading columns; MySQL refuses to drop it
+        indexes.append((match.group("name").replace("``", "`"), line))
+    return indexes
+
+
+def existing_indexes(cursor, table):
+    cursor.execute(f"SHOW INDEX FROM `{table}`")
+    return {row["Key_name"] if isinstance(row, dict) else row[2] for row in cursor.fetchall()}
+
+
+def add_indexes(cursor, table, definitions):
+    # InnoDB cannot add several FULLTEXT indexes in one ALTER, so those go one per statement.
+    btree = [d for d in definitions if d.startswith("KEY")]
+    groups = ([btree] if btree else []) + [[d] for d in definitions if not d.startswith("KEY")]
+    for group in groups:
+        cursor.execute(f"ALTER TABLE `{table}` " + ", ".join(f"ADD {definition}" for definition in group))
+
+
+def drop_secondary_indexes(conn, table, dump_dir):
+    """Record then drop `table`'s deferrable indexes. Returns the number dropped."""
+    with conn.cursor() as cursor:
+        indexes = deferrable_indexes(show_create_table(cursor, table))
+        if not indexes:
+            return 0
+        ledger = read_ledger(dump_dir)
+        pending = dict(ledger.get(table, {}))
+        pending.update(indexes)
+        ledger[table] = pending
+        write_ledger(dump_dir, ledger)
+        cursor.execute(f"ALTER TABLE `{table}` " + ", ".join(f"DROP INDEX `{name}`" for name, _ in indexes))
+    logging.info(f"🗂️ {table}: dropped {len(indexes)} secondary indexes for the load ({', '.join(n for n, _ in indexes)})")
+    return len(indexes)
+
+
+def rebuild_indexes(conn, table, dump_dir):
+    """Re-add the ledger's indexes for `table` that are missing, in one statement. Returns the number added."""
+    ledger = read_ledger(dump_dir)
+    pending = ledger.get(table)
+    if not pending:
+        return 0
+    with conn.cursor() as cursor:
+        present = existing_indexes(cursor, table)
+        missing = [definition for name, definition in pending.items() if name not in present]
+        if missing:
+            add_indexes(cursor, table, missing)
+    del ledger[table]
+    write_ledger(dump_dir, ledger)
+    logging.info(f"🗂️ {table}: rebuilt {len(missing)} secondary indexes")
+    return len(missing)
+
+
+def recover_pending(conn, dump_dir):
+    """Rebuild indexes left dropped by an interrupted run. Returns the tables repaired."""
+    repaired = []
+    for table in list(read_ledger(dump_dir)):
+        try:
+            if rebuild_indexes(conn, table, dump_dir):
+                repaired.append(table)
+        except Exception as e:
+            logging.error(f"❌ Could not restore deferred indexes of {table}: {e}")
+    if repaired:
+        print(f"🩹 Restored indexes left dropped by an interrupted run on: {', '.join(repaired)}")
+    return repaired
@@ -0,0 +1,109 @@
+"""
+local_db.py – The local DB's connection settings and the FK-safe table order.
+
+Kept apart from clean_up_local_db.py, which pulls in the whole restore
+pipeline, so `run.py verify` only pays for pymysql.  clean_up_local_db
+re-exports everything here.
+"""
+
+import pymysql
+
+# ---- CONFIG ----
+CONFIG = {
+    "host": "127.0.0.1",
+    "port": 3306,
+    "user": "root",
+    "password": "root",
+    "database": "cms_bike_backend"
+}
+
+# ---- DB CONNECTION ----
+def get_connection(config=None):
+    """Connection to CONFIG, or to `config` (a CONFIG-shaped dict) when given."""
+    config = config or CONFIG
+    return pymysql.connect(
+        host=config["host"],
+        port=config["port"],
+        user=config["user"],
+        password=config["password"],
+        database=config["database"],
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor,
+        autocommit=True
+    )
+
+# ---- RESTORE ORDERS ----
+INSERT_ORDER = [
+    'media_folder',
+    'media_library',
+    'state',
+    'city',
+    'area',
+    'dealer',
+    'partner',
+    'makes',
+    'tag',
+    'model',
+    'variant',
+    'model_video',
+    'model_video_category',
+    'model_video_header',
+    'celebrity',
+    'model_celebrity',
+    'model_color_image',
+    'model_image',
+    'model_tags',
+    'awards',
+    'model_awards',
+    'model_spec',
+    'model_spec_image',
+    'widget_data',
+    'expert_review',
+    'fun_fact',
+    'modelGncap',
+    'thought',
+    'variant_tags',
+    'variant_car',
+    'price',
+    'dealer_makes',
+    'dealer_partner',
+    'make_tags',
+    'image_tags',
+    'user_review',
+    'user_review_image',
+    'social_review',
+    'social_review_comment',
+    'leads',
+    'schedule_lead',
+    'partner_lead',
+    'other_popular_makes',
+    'state_wise_make_registration',
+    'review_report',
+    'monthly_sales'
+]
+
+DELETE_ORDER = list(reversed(INSERT_ORDER))
+
+# ---- VERIFY ORDER ----
+def verify_insert_order(order):
+    position = {table: i for i, table in enumerate(order)}
+    with get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT TABLE_NAME, REFERENCED_TABLE_NAME
+                FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+                WHERE TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME IS NOT NULL
+            """, (CONFIG["database"],))
+            errors = []
+            for row in cursor.fetchall():
+                dependent = row["TABLE_NAME"]
+                referenced = row["REFERENCED_TABLE_NAME"]
+                if dependent in position and referenced in position:
+                    if position[dependent] < position[referenced]:
+                        errors.append(f"❌ {dependent} comes before its dependency {referenced}")
+            if errors:
+                print("🚨 Invalid INSERT_ORDER detected:")
+                for err in errors:
+                    print(err)
+            else:
+                print("✅ INSERT_ORDER is valid and FK-safe.")
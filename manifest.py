@@ -0,0 +1,112 @@
+"""
+manifest.py – Atomic dump writes and the per-table dump manifest.
+
+Dump files are written to `<file>.tmp`, fsynced and renamed into place, so a
+reader only ever sees a complete file or the previous one.  The checksum and
+size are computed while writing.  The downloader records, per table,
+
+    {"rows": 1234, "schema": "<fingerprint>",
+     "files": [{"file": "price_dump.json", "bytes": 5678, "sha256": "…"}]}
+
+in `dev-db-data/manifest.json` (an empty table has rows 0 and no files).
+Before wiping anything the restore checks every table's files against it,
+and the schema fingerprint against the latest dev schema in
+`schema_cache.json`, and leaves tables whose dump is missing, truncated,
+altered or taken under an older schema untouched.
+"""
+
+import hashlib
+import json
+import os
+
+MANIFEST_FILE = "manifest.json"
+HASH_CHUNK_BYTES = 1 << 20
+TAIL_BYTES = 64
+
+
+class _HashingWriter:
+    """Text sink for json.dump that encodes, hashes and counts what it writes."""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.bytes = 0
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.sha256.update(data)
+        self.bytes += len(data)
+        self.f.write(data)
+
+
+def write_json_atomic(path, obj, indent=2, **dump_options):
+    """Write `obj` as JSON via temp file + fsync + rename. Returns the file's manifest entry."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        writer = _HashingWriter(f)
+        json.dump(obj, writer, indent=indent, ensure_ascii=False, **dump_options)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return {"file": os.path.basename(path), "bytes": writer.bytes, "sha256": writer.sha256.hexdigest()}
+
+
+def schema_fingerprint(columns):
+    """Short stable hash of a table's column list ([{name, key, type}], as fetched by the downloader)."""
+    canonical = json.dumps([[col["name"], col.get("key"), col.get("type")] for col in columns])
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def load_manifest(dump_dir):
+    path = os.path.join(dump_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def merge_manifest(dump_dir, entries):
+    """Merge this run's table entries into the manifest, atomically."""
+    manifest = load_manifest(dump_dir) or {}
+    manifest.update(entries)
+    write_json_atomic(os.path.join(dump_dir, MANIFEST_FILE), manifest, sort_keys=True)
+    return manifest
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_BYTES):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def ends_like_json_array(path):
+    """Cheap truncation check for dumps without a manifest: the last non-blank byte must be `]`."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(max(0, size - TAIL_BYTES))
+        return f.read().rstrip().endswith(b"]")
+
+
+def validate_table(dump_dir, entry, on_disk, checksums=True, columns=None):
+    """
+    Check one table's manifest entry against its files. `on_disk` are the dump files found
+    for the table; `columns` is the table's current dev schema (schema cache), if known.
+    Returns None when the dump is usable, else the reason it is not.
+    """
+    if columns and entry.get("schema") and schema_fingerprint(columns) != entry["schema"]:
+        return "dump was taken under an older schema than schema_cache.json"
+    expected = {os.path.join(dump_dir, f["file"]): f for f in entry.get("files", [])}
+    stray = sorted(set(on_disk) - set(expected))
+    if stray:
+        return f"files not in the manifest: {', '.join(os.path.basename(p) for p in stray)}"
+    for path, info in expected.items():
+        if not os.path.exists(path):
+            return f"{info['file']} is missing"
+        size = os.path.getsize(path)
+        if size != info["bytes"]:
+            return f"{info['file']} is {size} bytes, manifest says {info['bytes']}"
+        if checksums and file_sha256(path) != info["sha256"]:
+            return f"{info['file']} checksum mismatch"
+    return None
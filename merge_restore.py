@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+merge_restore.py – Bring the local DB in line with the dumps without wiping it.
+
+`clean_and_restore` deletes every table and re-inserts everything.  When only
+a few rows changed on dev since the last clone, merging is much cheaper: for
+each table with a single-column integer `id` primary key, the dump rows are
+sorted by id and walked in chunks of MERGE_CHUNK_ROWS.  Each chunk's id range is read
+back from the local table in one range query, both sides are reduced to a
+per-row hash of canonicalised values, and only the differences are written:
+
+  • ids only in the dump, or whose hash differs → INSERT ... ON DUPLICATE KEY UPDATE
+    (the helpers' upsert pattern), many rows per statement;
+  • ids only in the local table                → one DELETE ... WHERE id IN (...).
+
+Consecutive chunk ranges are contiguous, so local rows between or beyond the
+dump's ids are found too.  FK checks are off on the merge connection, as for
+the wipe.  Other tables fall back to wipe-and-reload: with a string key, Python's
+sort order and the column collation disagree, so a row upserted in one chunk
+could land in the next chunk's range and be deleted as local-only.
+
+    python3 merge_restore.py
+"""
+
+import json
+import logging
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from operator import itemgetter
+
+import pymysql
+from pymysql.constants import FIELD_TYPE
+
+import clean_up_local_db as restore
+import metrics
+from progress import NULL_PROGRESS, Progress
+from schema_sync import INTEGER_TYPES
+
+MERGE_CHUNK_ROWS = 2000
+ISO_DATETIME_RE = re.compile(r"^\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+NUMERIC_TYPES = {FIELD_TYPE.DECIMAL, FIELD_TYPE.NEWDECIMAL, FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE, FIELD_TYPE.TINY,
+                 FIELD_TYPE.SHORT, FIELD_TYPE.LONG, FIELD_TYPE.INT24, FIELD_TYPE.LONGLONG}
+
+
+# ---- ROW HASHING ----
+def canonical(value):
+    """
+    Map a dump value (JSON) and a local value (pymysql) to the same representation when
+    MySQL would store them identically, so equal rows hash equal.  Anything not covered
+    simply compares unequal and is rewritten, which is safe.
+    """
+    if value is None or isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (float, Decimal)):
+        number = (Decimal(repr(value)) if isinstance(value, float) else value).normalize()
+        return int(number) if number == number.to_integral_value() else str(number)
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).decode("utf-8", "replace")
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    if isinstance(value, str):
+        if value[:1] in ("{", "["):
+            try:
+                return canonical(json.loads(value))
+            except ValueError:
+                return value
+        if ISO_DATETIME_RE.match(value):
+            try:
+                parsed = datetime.fromisoformat(value)
+            except ValueError:
+                return value
+            if parsed.tzinfo:
+                # MySQL stores offset timestamps in local time, as the helpers do.
+                parsed = parsed.astimezone(tz=None).replace(tzinfo=None)
+            return parsed.strftime("%Y-%m-%d %H:%M:%S")
+        return value
+    return str(value)
+
+
+def canonical_number(value):
+    """Numeric columns: the API may send DECIMALs as strings ("12.50"), MySQL returns Decimal('12.50')."""
+    if isinstance(value, str):
+        try:
+            return canonical(Decimal(value))
+        except ArithmeticError:
+            return value
+    return canonical(value)
+
+
+def row_hash(values, numeric=frozenset()):
+    return hash(tuple(canonical_number(value) if i in numeric else canonical(value) for i, value in enumerate(values)))
+
+
+# ---- SQL ----
+def primary_key(cursor, table):
+    cursor.execute(f"SHOW KEYS FROM `{table}` WHERE Key_name = 'PRIMARY'")
+    return [row[4] for row in sorted(cursor.fetchall(), key=itemgetter(3))]
+
+
+def has_integer_id(cursor, table):
+    """True if `table`'s `id` column has an integer type (e.g. "int", "bigint unsigned")."""
+    cursor.execute(f"SHOW COLUMNS FROM `{table}` LIKE 'id'")
+    row = cursor.fetchone()
+    if not row:
+        return False
+    column_type = row[1].decode() if isinstance(row[1], bytes) else row[1]
+    return column_type.split("(")[0].split()[0].lower() in INTEGER_TYPES
+
+
+def build_upsert_sql(table, columns):
+    # `id` is updated too: if a new row collides with a local row on another unique key,
+    # that local row becomes the new one and is re-inserted when its own chunk is merged.
+    update_clause = ", ".join(f"`{col}` = VALUES(`{col}`)" for col in columns)
+    return f"{restore.build_insert_sql(table, columns)} ON DUPLICATE KEY UPDATE {update_clause}"
+
+
+def range_condition(lower, upper):
+    """WHERE clause for lower < id <= upper; None means unbounded."""
+    clauses, params = [], []
+    if lower is not None:
+        clauses.append("`id` > %s")
+        params.append(lower)
+    if upper is not None:
+        clauses.append("`id` <= %s")
+        params.append(upper)
+    return " AND ".join(clauses) or "1=1", params
+
+
+def upsert(cursor, table, columns, sql, rows, m):
+    """Multi-row upsert; if the batch fails, retry row by row so only the bad rows are rejected."""
+    if not rows:
+        return
+    m["round_trips"] += 1
+    try:
+        cursor.executemany(sql, rows)
+        return
+    except pymysql.MySQLError:
+        pass
+    for values in rows:
+        m["round_trips"] += 1
+        try:
+            cursor.execute(sql, values)
+        except pymysql.MySQLError as e:
+            m["failed"] += 1
+            restore.REJECTS.reject(table, columns, values, e)
+
+
+# ---- MERGE ----
+def merge_table(conn, table):
+    """Merge one table's dump into the local table. Returns False if it cannot be merged by id."""
+    with conn.cursor(pymysql.cursors.Cursor) as cursor:
+        if primary_key(cursor, table) != ["id"] or not has_integer_id(cursor, table):
+            return False
+        data = restore.load_table_rows(table, defer=False)
+        with metrics.timed("merge", table, rows=len(data or ()), inserted=0, updated=0, deleted=0,
+                           unchanged=0, failed=0, round_trips=0) as m:
+            if not data:
+                m["round_trips"] += 1
+                m["deleted"] = cursor.execute(f"DELETE FROM `{table}`")
+                return True
+            if "id" not in data.columns:
+                return False
+            id_index = data.columns.index("id")
+            try:
+                data.rows.sort(key=itemgetter(id_index))
+            except TypeError:
+                return False   # mixed id types in the dump; let the reload deal with it
+
+            columns = data.columns
+            select_list = ", ".join(f"`{col}`" for col in columns)
+            upsert_sql = build_upsert_sql(table, columns)
+            lower, numeric = None, None
+            for start in range(0, len(data.rows), MERGE_CHUNK_ROWS):
+                chunk = data.rows[start:start + MERGE_CHUNK_ROWS]
+                last = start + MERGE_CHUNK_ROWS >= len(data.rows)
+                upper = None if last else chunk[-1][id_index]
+                where, params = range_condition(lower, upper)
+                m["round_trips"] += 1
+                cursor.execute(f"SELECT {select_list} FROM `{table}` WHERE {where}", params)
+                if numeric is None:
+                    numeric = frozenset(i for i, col in enumerate(cursor.description) if col[1] in NUMERIC_TYPES)
+                local = {row[id_index]: row_hash(row, numeric) for row in cursor.fetchall()}
+
+                writes = []
+                for values in chunk:
+                    local_hash = local.pop(values[id_index], None)
+                    if local_hash is None:
+                        m["inserted"] += 1
+                        writes.append(values)
+                    elif local_hash != row_hash(values, numeric):
+                        m["updated"] += 1
+                        writes.append(values)
+                    else:
+                        m["unchanged"] += 1
+                if local:
+                    # Deletes first, so the upserts don't collide with rows that are going away.
+                    m["round_trips"] += 1
+                    m["deleted"] += cursor.execute(
+                        f"DELETE FROM `{table}` WHERE `id` IN ({', '.join(['%s'] * len(local))})", list(local))
+                upsert(cursor, table, columns, upsert_sql, writes, m)
+                restore.PROGRESS.advance(table, len(chunk))
+                lower = upper
+            logging.info(f"🔁 {table}: {m['inserted']} inserted, {m['updated']} updated, "
+                         f"{m['deleted']} deleted, {m['unchanged']} unchanged")
+    return True
+
+
+def reload_table(conn, table):
+    """Wipe-and-reload fallback for tables that cannot be merged by id."""
+    logging.info(f"🚮 {table}: no single integer `id` primary key, reloading it instead of merging")
+    with conn.cursor() as cursor, metrics.timed("wipe", table, round_trips=1) as m:
+        m["rows"] = cursor.execute(f"DELETE FROM `{table}`")
+    restore.insert_table(table)
+
+
+def merge_all_data_in_order():
+    counts = restore.expected_row_counts()
+    restore.PROGRESS = Progress("🔁 merge", totals={t: counts[t] for t in restore.INSERT_ORDER if t in counts})
+    try:
+        with restore.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+            for table in restore.INSERT_ORDER:
+                if table in restore.SKIPPED_TABLES:
+                    continue
+                restore.PROGRESS.start(table)
+                try:
+                    if not merge_table(conn, table):
+                        reload_table(conn, table)
+                except pymysql.MySQLError as e:
+                    logging.error(f"❌ Failed to merge {table}: {e}")
+                restore.PROGRESS.finish(table)
+            with conn.cursor() as cursor:
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    finally:
+        restore.PROGRESS.close()
+        restore.PROGRESS = NULL_PROGRESS
+
+
+def merge_and_restore(LOG_FILE="db_clone_log.logs"):
+    restore.prepare_restore(LOG_FILE)
+    try:
+        merge_all_data_in_order()
+    finally:
+        restore.report_rejects()
+    print("✅ Database merged with the dumps successfully.")
+
+
+if __name__ == "__main__":
+    metrics.start_run()
+    merge_and_restore()
+    metrics.print_summary()
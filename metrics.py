@@ -0,0 +1,146 @@
+"""
+metrics.py – Structured timing and throughput metrics for a clone run.
+
+Every pipeline step emits one JSON-lines record (phase, table, duration,
+rows, bytes, failures, DB round trips, …) to METRICS_FILE, and the records
+of the current run are kept in memory so `print_summary()` can show which
+tables and phases dominated.  Emitting happens once per table/shard/page,
+never per row.
+
+Set CLONE_PROFILE=cprofile or CLONE_PROFILE=tracemalloc to profile the
+whole run with `profiled()`.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+
+METRICS_FILE = os.getenv("CLONE_METRICS_FILE", "db_clone_metrics.jsonl")
+PROFILE = os.getenv("CLONE_PROFILE", "")          # "", "cprofile" or "tracemalloc"
+PROFILE_TOP = 25
+
+_lock = threading.Lock()
+_records = []
+_run_id = None
+_file = None
+
+
+def start_run():
+    """Start a new run: records emitted from now on share a run id and make up the summary."""
+    global _run_id
+    with _lock:
+        _run_id = uuid.uuid4().hex[:12]
+        _records.clear()
+    return _run_id
+
+
+def emit(phase, table=None, **fields):
+    global _file
+    record = {"ts": round(time.time(), 3), "run": _run_id, "phase": phase, "table": table, **fields}
+    with _lock:
+        _records.append(record)
+        if _file is None:
+            _file = open(METRICS_FILE, "a", encoding="utf-8")
+        _file.write(json.dumps(record, default=str) + "\n")
+        _file.flush()
+
+
+@contextmanager
+def timed(phase, table=None, **fields):
+    """
+    Time a block and emit it; the yielded dict collects extra fields:
+
+        with timed("insert", table) as m:
+            ...
+            m["rows"] = n
+    """
+    started = time.perf_counter()
+    try:
+        yield fields
+    finally:
+        seconds = time.perf_counter() - started
+        fields["seconds"] = round(seconds, 4)
+        if fields.get("rows") and seconds:
+            fields.setdefault("rows_per_s", round(fields["rows"] / seconds, 1))
+        emit(phase, table, **fields)
+
+
+def records():
+    with _lock:
+        return list(_records)
+
+
+def summarise(run_records=None):
+    """Aggregate records per table: seconds and bytes per phase plus rows, failures and round trips."""
+    tables = defaultdict(lambda: defaultdict(float))
+    for record in run_records if run_records is not None else records():
+        if not record.get("table"):
+            continue
+        agg = tables[record["table"]]
+        agg[f"{record['phase']}_s"] += record.get("seconds", 0)
+        # Per phase: download (bytes over the wire) and parse (dump file size) measure the same data.
+        agg[f"{record['phase']}_bytes"] += record.get("bytes", 0) or 0
+        for field in ("failed", "round_trips", "requests"):
+            agg[field] += record.get(field, 0) or 0
+        if record["phase"] in ("download", "insert"):
+            agg[f"{record['phase']}_rows"] += record.get("rows", 0) or 0
+    return tables
+
+
+def print_summary(run_records=None, limit=None):
+    tables = summarise(run_records)
+    if not tables:
+        return
+    phases = ("download", "normalise", "parse", "wipe", "insert")
+    order = sorted(tables, key=lambda t: -sum(tables[t][f"{p}_s"] for p in phases))
+    header = (f"{'table':<32}{'download s':>11}{'dl MB':>8}{'norm s':>8}{'parse s':>8}{'dump MB':>8}{'wipe s':>8}"
+              f"{'insert s':>9}{'rows':>10}{'rows/s':>10}{'failed':>8}{'trips':>9}")
+    print("\n📊 Clone summary (slowest first)")
+    print(header)
+    print("-" * len(header))
+    for table in order[:limit]:
+        agg = tables[table]
+        rows = int(agg["insert_rows"] or agg["download_rows"])
+        rate = agg["insert_rows"] / agg["insert_s"] if agg["insert_s"] else 0
+        print(f"{table:<32}{agg['download_s']:>11.2f}{agg['download_bytes'] / 1e6:>8.1f}{agg['normalise_s']:>8.2f}"
+              f"{agg['parse_s']:>8.2f}{agg['parse_bytes'] / 1e6:>8.1f}{agg['wipe_s']:>8.2f}{agg['insert_s']:>9.2f}{rows:>10}"
+              f"{rate:>10.0f}{int(agg['failed']):>8}{int(agg['round_trips'] + agg['requests']):>9}")
+    print(f"📄 Per-step metrics: {METRICS_FILE}")
+
+
+@contextmanager
+def profiled(name="clone", mode=None):
+    """Profile the block with cProfile or tracemalloc, depending on CLONE_PROFILE (no-op if unset)."""
+    mode = PROFILE if mode is None else mode
+    if mode == "cprofile":
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(f"{name}.prof")
+            print(f"\n🔬 cProfile top {PROFILE_TOP} by cumulative time (full profile: {name}.prof)")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(PROFILE_TOP)
+    elif mode == "tracemalloc":
+        import tracemalloc
+
+        tracemalloc.start(10)
+        try:
+            yield
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"\n🔬 tracemalloc peak {peak / 1e6:.1f} MB; top {PROFILE_TOP} allocation sites:")
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                print(f"  {stat}")
+    else:
+        yield
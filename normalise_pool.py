@@ -0,0 +1,64 @@
+"""
+normalise_pool.py – Optional process-pool stage for row normalisation.
+
+Normalising dump rows (ISO dates, JSON re-serialisation, key mapping) is
+pure CPU work.  `iter_normalised_batches` splits the rows into chunks,
+normalises them on a pool of worker processes and yields the ready batches
+in input order.  A bounded number of chunks is kept in flight ahead of the
+consumer, so while the DB writer is executing one batch the workers are
+already preparing the next ones.
+
+The normalise function must be picklable: a module-level function, or a
+functools.partial of one.
+
+    NORMALISE_WORKERS=4 python3 -m helpers.bulk_model_loader
+"""
+
+import os
+from collections import deque
+from itertools import chain, islice
+
+NORMALISE_WORKERS = int(os.getenv("NORMALISE_WORKERS", 0))       # 0/1 → normalise inline
+NORMALISE_CHUNK_SIZE = int(os.getenv("NORMALISE_CHUNK_SIZE", 2000))
+BATCHES_IN_FLIGHT_PER_WORKER = 2
+
+
+def _normalise_chunk(fn, chunk):
+    return [fn(js) for js in chunk]
+
+
+def _chunks(rows, size):
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_normalised_batches(rows, fn, workers=None, chunk_size=None):
+    """Yield lists of `fn(row)` results, batch by batch, in input order."""
+    workers = NORMALISE_WORKERS if workers is None else workers
+    chunk_size = chunk_size or NORMALISE_CHUNK_SIZE
+
+    if workers <= 1:
+        for chunk in _chunks(rows, chunk_size):
+            yield _normalise_chunk(fn, chunk)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor   # multiprocessing is only paid for when used
+
+    max_in_flight = workers * BATCHES_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        ready = deque()
+        for chunk in _chunks(rows, chunk_size):
+            ready.append(pool.submit(_normalise_chunk, fn, chunk))
+            if len(ready) >= max_in_flight:
+                yield ready.popleft().result()
+        while ready:
+            yield ready.popleft().result()
+
+
+def iter_normalised(rows, fn, workers=None, chunk_size=None):
+    """Flat, ordered iterator over normalised rows (see iter_normalised_batches)."""
+    return chain.from_iterable(iter_normalised_batches(rows, fn, workers, chunk_size))
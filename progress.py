@@ -0,0 +1,134 @@
+"""
+progress.py – Live rows/s and ETA reporting for long downloads and restores.
+
+Workers only call `advance(table, n)` once per page or batch (a lock and two
+integer additions); a background thread renders the state every
+`interval` seconds, so reporting costs nothing measurable in the hot loops.
+Totals come from information_schema estimates (download) or from the row
+counts recorded by the downloader (restore); a table whose total is unknown
+is given one as soon as its dump is loaded.
+
+On a terminal the status line is redrawn in place; otherwise (log files,
+CI) a line is printed every NON_TTY_INTERVAL seconds.
+"""
+
+import sys
+import threading
+import time
+
+TTY_INTERVAL = 1.0
+NON_TTY_INTERVAL = 15.0
+MAX_TABLES_SHOWN = 3
+
+
+def format_duration(seconds):
+    if seconds is None:
+        return "?"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class Progress:
+    def __init__(self, phase, totals=None, stream=None, interval=None):
+        self.phase = phase
+        self.stream = stream or sys.stderr
+        self.is_tty = hasattr(self.stream, "isatty") and self.stream.isatty()
+        self.interval = interval or (TTY_INTERVAL if self.is_tty else NON_TTY_INTERVAL)
+        self.totals = dict(totals or {})
+        self.done = {}
+        self.started = {}
+        self.active = set()
+        self.done_all = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # ---- called by workers ----
+    def set_total(self, table, total):
+        with self._lock:
+            self.totals[table] = total
+
+    def start(self, table):
+        with self._lock:
+            self.started.setdefault(table, time.monotonic())
+            self.done.setdefault(table, 0)
+            self.active.add(table)
+
+    def advance(self, table, rows):
+        with self._lock:
+            self.done[table] = self.done.get(table, 0) + rows
+            self.done_all += rows
+
+    def finish(self, table):
+        with self._lock:
+            self.active.discard(table)
+            # Estimates can be off; once a table is finished its real count is its total.
+            self.totals[table] = self.done.get(table, 0)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self._render(final=True)
+
+    # ---- rendering ----
+    def _eta(self, done, total, elapsed):
+        if not done or not elapsed or total <= done:
+            return None if total > done else 0
+        return (total - done) / (done / elapsed)
+
+    def status_line(self):
+        now = time.monotonic()
+        with self._lock:
+            total = sum(max(self.totals.get(t, 0), self.done.get(t, 0)) for t in set(self.totals) | set(self.done))
+            done = self.done_all
+            tables = sorted(self.active, key=lambda t: -self.done.get(t, 0))[:MAX_TABLES_SHOWN]
+            per_table = [(t, self.done.get(t, 0), self.totals.get(t, 0), now - self.started[t]) for t in tables]
+        elapsed = now - self._started_at
+        rate = done / elapsed if elapsed else 0
+        pct = f"{done / total:6.1%}" if total else "     ?"
+        parts = [f"{self.phase} {pct} {done:,}/{total:,} rows · {rate:,.0f} rows/s · "
+                 f"ETA {format_duration(self._eta(done, total, elapsed))}"]
+        for table, t_done, t_total, t_elapsed in per_table:
+            t_pct = f"{t_done / t_total:.0%}" if t_total else f"{t_done:,}"
+            parts.append(f"{table} {t_pct} ETA {format_duration(self._eta(t_done, t_total, t_elapsed))}")
+        return " | ".join(parts)
+
+    def _render(self, final=False):
+        line = self.status_line()
+        if self.is_tty:
+            self.stream.write("\r\033[K" + line + ("\n" if final else ""))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._render()
+
+
+class NullProgress:
+    """Drop-in used when no progress is being reported."""
+
+    def set_total(self, table, total):
+        pass
+
+    def start(self, table):
+        pass
+
+    def advance(self, table, rows):
+        pass
+
+    def finish(self, table):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_PROGRESS = NullProgress()
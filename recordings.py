@@ -0,0 +1,23 @@
+"""
+recordings.py – Where recorded dev API responses live.
+
+dev_api_client.py saves every response body under DEV_API_RECORD_DIR and
+dev_api_stub.py --recordings replays them; both name the file after the
+query, so this module is shared by the two and depends on nothing else
+(the stub and the benchmarks run without aiohttp).
+"""
+
+import hashlib
+import os
+import re
+
+RECORD_DIR = os.getenv("DEV_API_RECORD_DIR")
+
+
+def query_key(query):
+    """Stable key for a query: sha1 of its whitespace-collapsed text."""
+    return hashlib.sha1(re.sub(r"\s+", " ", query).strip().encode("utf-8")).hexdigest()
+
+
+def recording_path(directory, query):
+    return os.path.join(directory, f"{query_key(query)}.json")
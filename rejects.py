@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+rejects.py – Compact sink for rows the restore could not write.
+
+Instead of logging every failed row, the restore hands it to a RejectSink.
+The sink counts it by (table, error code) on the spot and queues it for a
+background writer thread, which serialises it as one NDJSON line in
+`rejects/<table>.ndjson` through a large write buffer.  When the sink is
+closed only the aggregated counts go to the log.
+
+After fixing the cause, re-play the rejected rows with:
+
+    python3 rejects.py replay [table ...]
+
+A fan-out restore keeps each target's rejects in `rejects/<target>/`; those
+are replayed into that target's DB, whose config comes from targets.json:
+
+    python3 rejects.py replay --target ci --targets targets.json [table ...]
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from decimal import Decimal
+
+REJECTS_DIR = os.getenv("CLONE_REJECTS_DIR", "rejects")
+TARGET_FILE = "target.json"     # in a fan-out target's rejects directory: which target the rows belong to
+WRITE_BUFFER_BYTES = 1 << 20
+_STOP = object()
+
+
+def error_code(error):
+    """(code, message) of a DB-API error; pymysql / mysql-connector put the errno in args[0]."""
+    args = getattr(error, "args", ())
+    if len(args) >= 2 and isinstance(args[0], int):
+        return args[0], str(args[1])
+    return type(error).__name__, str(error)
+
+
+def rejects_path(table, directory=REJECTS_DIR):
+    return os.path.join(directory, f"{table}.ndjson")
+
+
+# Values JSON has no type for are tagged, so a replay writes back exactly what failed.
+def encode_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"$base64": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    return str(value)   # dates / datetimes: MySQL parses their str() form
+
+
+def decode_value(obj):
+    if len(obj) == 1:
+        if "$base64" in obj:
+            return base64.b64decode(obj["$base64"])
+        if "$decimal" in obj:
+            return Decimal(obj["$decimal"])
+    return obj
+
+
+def dump_record(record):
+    return json.dumps(record, ensure_ascii=False, default=encode_value) + "\n"
+
+
+class RejectSink:
+    def __init__(self, directory=REJECTS_DIR):
+        self.directory = directory
+        self.counts = Counter()
+        self.samples = {}
+        self._lock = threading.Lock()
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+    def clear(self, tables):
+        """Drop rejects left by a previous run for tables that are about to be reloaded."""
+        for table in tables:
+            path = rejects_path(table, self.directory)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reject(self, table, columns, values, error, op="insert"):
+        code, message = error_code(error)
+        with self._lock:
+            self.counts[(table, code)] += 1
+            self.samples.setdefault((table, code), message)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._write_loop, daemon=True)
+                self._thread.start()
+        # Serialisation happens on the writer thread, off the insert loop.
+        self._queue.put((table, op, code, message, columns, values))
+
+    def _write_loop(self):
+        os.makedirs(self.directory, exist_ok=True)
+        files = {}
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    return
+                table, op, code, message, columns, values = item
+                if table not in files:
+                    files[table] = open(rejects_path(table, self.directory), "a", encoding="utf-8",
+                                        buffering=WRITE_BUFFER_BYTES)
+                record = {"op": op, "code": code, "message": message, "row": dict(zip(columns, values))}
+                files[table].write(dump_record(record))
+        finally:
+            for f in files.values():
+                f.close()
+
+    def close(self):
+        """Flush pending rejects, log the aggregated counts and return them."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+            samples, self.samples = self.samples, {}
+        for (table, code), count in sorted(counts.items(), key=lambda item: -item[1]):
+            logging.error(f"❌ {table}: {count} rows rejected with {code} "
+                          f"(e.g. {samples[(table, code)]}) → {rejects_path(table, self.directory)}")
+        return counts
+
+
+# ---- REPLAY ----
+def replay_file(cursor, table, path):
+    """Re-apply one table's rejects; rows that fail again stay in the file. Returns (applied, still_failing)."""
+    from clean_up_local_db import build_insert_sql
+
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line, object_hook=decode_value) for line in f if line.strip()]
+    remaining = []
+    for record in records:
+        row = record["row"]
+        if record.get("op") == "update":
+            assignments = ", ".join(f"`{col}`=%s" for col in row if col != "id")
+            sql = f"UPDATE `{table}` SET {assignments} WHERE id=%s"
+            values = [value for col, value in row.items() if col != "id"] + [row["id"]]
+        else:
+            sql = build_insert_sql(table, list(row))
+            values = list(row.values())
+        try:
+            cursor.execute(sql, values)
+        except Exception as e:
+            record["code"], record["message"] = error_code(e)
+            remaining.append(record)
+
+    if remaining:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in remaining:
+                f.write(dump_record(record))
+        os.replace(tmp_path, path)
+    else:
+        os.remove(path)
+    return len(records) - len(remaining), len(remaining)
+
+
+def replay_config(directory, targets_file=None):
+    """Connection config for the DB the rejects in `directory` belong to; None means the local CONFIG."""
+    marker = os.path.join(directory, TARGET_FILE)
+    if not os.path.exists(marker):
+        return None
+    with open(marker, encoding="utf-8") as f:
+        name = json.load(f)["name"]
+    if not targets_file:
+        raise SystemExit(f"❌ {directory} holds the rejects of fan-out target {name!r}; "
+                         f"pass --targets <targets.json> so they are replayed into that DB.")
+    from fanout_restore import target_config
+
+    with open(targets_file, encoding="utf-8") as f:
+        for spec in json.load(f):
+            target_name, config = target_config(spec)
+            if target_name == name:
+                return config
+    raise SystemExit(f"❌ No target named {name!r} in {targets_file}.")
+
+
+def replay(tables=None, directory=REJECTS_DIR, targets_file=None):
+    from local_db import INSERT_ORDER, get_connection
+
+    if not os.path.isdir(directory):
+        print(f"✅ No rejects directory ({directory}), nothing to replay.")
+        return
+    config = replay_config(directory, targets_file)
+    available = [name[:-len(".ndjson")] for name in os.listdir(directory) if name.endswith(".ndjson")]
+    # Parents before children, as in the restore, so replayed rows find the rows they reference.
+    position = {table: i for i, table in enumerate(INSERT_ORDER)}
+    ordered = sorted(tables or available, key=lambda t: (position.get(t, len(position)), t))
+    if config:
+        print(f"🎯 Replaying into {config['host']}:{config['port']}/{config['database']}")
+    with get_connection(config) as conn:
+        with conn.cursor() as cursor:
+            for table in ordered:
+                path = rejects_path(table, directory)
+                if not os.path.exists(path):
+                    print(f"⚠️  No rejects for {table}")
+                    continue
+                applied, failing = replay_file(cursor, table, path)
+                print(f"{'✅' if not failing else '⚠️ '} {table}: {applied} replayed, {failing} still failing")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    replay_parser = sub.add_parser("replay", help="re-insert rejected rows")
+    replay_parser.add_argument("tables", nargs="*", help="tables to replay (default: all)")
+    replay_parser.add_argument("--dir", default=REJECTS_DIR)
+    replay_parser.add_argument("--target", help=f"fan-out target name (replays {REJECTS_DIR}/<target>/)")
+    replay_parser.add_argument("--targets", help="the fan-out targets.json, for the target's connection config")
+    args = parser.parse_args()
+    replay(args.tables, os.path.join(args.dir, args.target) if args.target else args.dir, args.targets)
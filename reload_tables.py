@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+reload_tables.py – Refresh a few stale tables without a full clone.
+
+Downloads only the named tables (plus, with --with-children, every local
+table that references them through a foreign key, transitively), then
+replaces each one from its fresh dump:
+
+  • if a rename loses nothing, a shadow table `<table>__shadow` is created
+    from the local `SHOW CREATE TABLE`, filled in one transaction with
+    multi-row INSERTs, and swapped in atomically with `RENAME TABLE t TO
+    t__old, t__shadow TO t`; the old copy is dropped.  The shadow's
+    constraints are created unnamed, so MySQL calls them
+    `t__shadow_ibfk_N` / `t__shadow_chk_N` and renames them to `t_...`
+    along with the table;
+  • otherwise the rows go straight into `t`: DELETE + multi-row INSERTs in
+    a single transaction, FK checks off.  That is the case when other
+    tables reference `t` (a rename would drag their foreign keys along to
+    `t__old`), when `t` has constraints with custom names (a rename
+    cannot keep them) or triggers (they would be dropped with `t__old`).
+
+Either way readers keep seeing the old rows until the rename / commit.
+
+Tables whose download fails are not touched: their previous dump may
+still be valid, but it is not the fresh one that was asked for.
+
+    python3 run.py reload price
+    python3 run.py reload model --with-children
+"""
+
+import logging
+import re
+
+import pymysql
+
+import clean_up_local_db as restore
+import metrics
+
+SHADOW_SUFFIX = "__shadow"
+OLD_SUFFIX = "__old"
+
+CONSTRAINT_NAME_RE = re.compile(r"CONSTRAINT\s+`((?:[^`]|``)+)`\s+")
+AUTO_INCREMENT_RE = re.compile(r"\s+AUTO_INCREMENT=\d+")
+
+
+# ---- FOREIGN KEYS ----
+def referencing_tables(cursor, table):
+    """Local tables (other than `table` itself) with a foreign key to `table`."""
+    cursor.execute("""
+        SELECT DISTINCT TABLE_NAME
+        FROM INFORMATION_SCHEMA.KEY_COLUMN_USAGE
+        WHERE TABLE_SCHEMA = %s AND REFERENCED_TABLE_NAME = %s AND TABLE_NAME <> %s
+    """, (restore.CONFIG["database"], table, table))
+    return sorted(row["TABLE_NAME"] for row in cursor.fetchall())
+
+
+def with_children(cursor, tables):
+    """`tables` plus every table that references one of them, transitively."""
+    found, pending = list(tables), list(tables)
+    while pending:
+        for child in referencing_tables(cursor, pending.pop()):
+            if child not in found:
+                found.append(child)
+                pending.append(child)
+    return found
+
+
+def in_insert_order(tables):
+    """Parents first, as in INSERT_ORDER; tables it doesn't list go last."""
+    position = {table: i for i, table in enumerate(restore.INSERT_ORDER)}
+    return sorted(tables, key=lambda t: position.get(t, len(position)))
+
+
+def has_triggers(cursor, table):
+    cursor.execute("""
+        SELECT COUNT(*) AS n FROM INFORMATION_SCHEMA.TRIGGERS
+        WHERE EVENT_OBJECT_SCHEMA = %s AND EVENT_OBJECT_TABLE = %s
+    """, (restore.CONFIG["database"], table))
+    return cursor.fetchone()["n"] > 0
+
+
+def custom_constraint_names(create_table, table):
+    """Constraint names MySQL did not generate; `<table>_ibfk_N` / `<table>_chk_N` follow the table on RENAME."""
+    generated = re.compile(rf"{re.escape(table)}_(?:ibfk|chk)_\d+")
+    return [name for name in CONSTRAINT_NAME_RE.findall(create_table) if not generated.fullmatch(name)]
+
+
+def rename_blockers(cursor, table, create_table):
+    """What a RENAME swap would lose or break for `table`; empty when the swap is safe."""
+    blockers = []
+    if referencing_tables(cursor, table):
+        blockers.append("referenced by other tables")
+    if custom_constraint_names(create_table, table):
+        blockers.append("custom constraint names")
+    if has_triggers(cursor, table):
+        blockers.append("triggers")
+    return blockers
+
+
+# ---- LOADING ----
+def show_create_table(conn, table):
+    with conn.cursor() as cursor:
+        cursor.execute(f"SHOW CREATE TABLE `{table}`")
+        return cursor.fetchone()["Create Table"]
+
+
+def shadow_ddl(create_table, table, shadow):
+    ddl = create_table.replace(f"CREATE TABLE `{table}`", f"CREATE TABLE `{shadow}`", 1)
+    ddl = ddl.replace(f"REFERENCES `{table}` (", f"REFERENCES `{shadow}` (")   # self-references
+    ddl = CONSTRAINT_NAME_RE.sub("CONSTRAINT ", ddl)   # only generated names get here
+    return AUTO_INCREMENT_RE.sub("", ddl)
+
+
+def load_rows(conn, table, target, data, m, wipe=False):
+    """Write `table`'s rows into `target` in one transaction, after emptying it when `wipe`."""
+    with conn.cursor() as cursor:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+        conn.begin()
+        try:
+            if wipe:
+                cursor.execute(f"DELETE FROM `{target}`")
+            if data:
+                sql = restore.build_insert_sql(target, data.columns)
+                for _, batch in data.chunks(restore.BATCH_SIZE):
+                    m["round_trips"] += 1
+                    try:
+                        cursor.executemany(sql, batch)
+                        continue
+                    except pymysql.MySQLError:
+                        pass
+                    # Find the bad rows; InnoDB rolled back only the failed statement.
+                    for values in batch:
+                        m["round_trips"] += 1
+                        try:
+                            cursor.execute(sql, values)
+                        except pymysql.MySQLError as e:
+                            m["failed"] += 1
+                            restore.REJECTS.reject(table, data.columns, values, e)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+
+
+def rename_in(conn, table, create_table, data, m):
+    shadow, old = f"{table}{SHADOW_SUFFIX}", f"{table}{OLD_SUFFIX}"
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS `{shadow}`")
+        cursor.execute(shadow_ddl(create_table, table, shadow))
+    load_rows(conn, table, shadow, data, m)
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS `{old}`")
+        cursor.execute(f"RENAME TABLE `{table}` TO `{old}`, `{shadow}` TO `{table}`")
+        cursor.execute(f"DROP TABLE `{old}`")
+
+
+def reload_table(conn, table):
+    data = restore.load_table_rows(table, defer=False)
+    with metrics.timed("reload", table, rows=len(data or ()), failed=0, round_trips=0) as m:
+        create_table = show_create_table(conn, table)
+        with conn.cursor() as cursor:
+            blockers = rename_blockers(cursor, table, create_table)
+        if blockers:
+            logging.info(f"🔄 {table}: loading in place instead of renaming ({', '.join(blockers)})")
+            load_rows(conn, table, table, data, m, wipe=True)
+            m["strategy"] = "in place"
+        else:
+            rename_in(conn, table, create_table, data, m)
+            m["strategy"] = "rename"
+    logging.info(f"🔄 {table}: {m['rows'] - m['failed']} rows reloaded ({m['strategy']})")
+    print(f"🔄 {table}: {m['rows'] - m['failed']:,} rows reloaded ({m['strategy']})")
+
+
+# ---- MAIN ENTRY ----
+def reload_tables(tables, bearer_token, LOG_FILE, children=False, download=True):
+    """Reload `tables` (and, with `children`, their dependants); returns the tables that were reloaded."""
+    from download_dev_table_data import download_db_data_from_dev
+
+    restore.setup_logging(LOG_FILE)
+    if children:
+        with restore.get_connection() as conn, conn.cursor() as cursor:
+            tables = with_children(cursor, tables)
+    tables = in_insert_order(tables)
+    print(f"🔄 Reloading: {', '.join(tables)}")
+
+    if download:
+        downloaded = download_db_data_from_dev(bearer_token, LOG_FILE, only=tables)
+        if downloaded is None:
+            print(f"🛑 Download failed (see `{LOG_FILE}`) – no table was reloaded.")
+            return []
+        # A failed table keeps its previous manifest entry and files, which would pass validation.
+        stale = [t for t in tables if t not in downloaded]
+        if stale:
+            logging.error(f"❌ Not downloaded, not reloading: {', '.join(stale)}")
+            print(f"🛑 Download failed for {', '.join(stale)} – left as they were.")
+            tables = [t for t in tables if t in downloaded]
+        if not tables:
+            return []
+    restore.sync_schema(tables)
+    restore.validate_dumps(tables)
+    tables = [t for t in tables if t not in restore.SKIPPED_TABLES]
+    restore.REJECTS.clear(tables)
+    reloaded = []
+    try:
+        with restore.get_connection() as conn:
+            for table in tables:
+                try:
+                    reload_table(conn, table)
+                    reloaded.append(table)
+                except pymysql.MySQLError as e:
+                    logging.error(f"❌ Failed to reload {table}: {e}")
+                    print(f"❌ {table}: reload failed, local table left as it was ({e})")
+    finally:
+        restore.report_rejects()
+    return reloaded
@@ -1,11 +1,121 @@
+#!/usr/bin/env python3
+"""
+run.py – Clone the dev DB into the local one.
 
-from clean_up_local_db import clean_and_restore
-from download_dev_table_data import download_db_data_from_dev
+    python3 run.py                          # download + full restore (same as `all`)
+    python3 run.py download
+    python3 run.py restore [--merge | --fanout targets.json]
+    python3 run.py verify                   # check INSERT_ORDER against the local FKs only
+    python3 run.py load-table price [dump.json]
+    python3 run.py reload price [--with-children]   # fresh download + swap of just these tables
+
+Heavy modules (aiohttp, pymysql, mysql-connector, dateutil) are imported by
+the subcommand that needs them, so quick commands start fast.
+"""
+
+import argparse
+import sys
 
 LOG_FILE = "db_clone_log.logs"
 BEARER_TOKEN = "eyJhbGciOiJSUzI1NiIsImtpZCI6IlNLMmNjOWZ4NnBMRXRXTGxGV3pQVVZrRGFiRDFKIiwidHlwIjoiSldUIn0.eyJhbXIiOlsib2F1dGgiXSwiZHJuIjoiRFMiLCJlbWFpbCI6Im1vaGQuYW1hYW4xQGNhcnMyNC5jb20iLCJleHAiOjE3NTAzMTA3MjcsImlhdCI6MTc0OTQ0NjcyNywiaXNzIjoiUDJjYzlmdlZwWHljY2QzcTdWZ0pCTTRnSWJhQiIsIm5hbWUiOiJNb2hkIEFtYWFuIiwicmV4cCI6IjIwMjUtMDctMDdUMDU6MjU6MjdaIiwic3ViIjoiVTJjdnVsSWN0TkpWa3NWMnZ0cGZFZ0NzQVRWZSIsInRlbmFudHMiOnsiMDMzN2YwMGQtZWMyYS00ZTFmLTg4NDEtMGI5ZWU2ZDA4NzI1Ijp7InBlcm1pc3Npb25zIjpbXSwicm9sZXMiOlsiUFVCTElTSEVSIl19LCIxNTMyYmZhMS1lM2Q4LTQyZGItODk4Ny01YWU1YmI0NzlkZjgiOnsicGVybWlzc2lvbnMiOltdLCJyb2xlcyI6WyJQVUJMSVNIRVIiXX0sIjVkY2IzODc5LTk4YTktNDJiNS04YjJkLTgwODU3OGZjZjVjMiI6eyJwZXJtaXNzaW9ucyI6W10sInJvbGVzIjpbIlBVQkxJU0hFUiJdfSwiNWZhMzI0YWItZjg5My00ZGQyLWI2YWUtZDg2MDZkNTdlNmI1Ijp7InBlcm1pc3Npb25zIjpbXSwicm9sZXMiOlsiUFVCTElTSEVSIl19LCI2YmE3YjgxMC05ZGFkLTExZDEtODBiNC0wMGMwNGZkNDMwYzgiOnsicGVybWlzc2lvbnMiOltdLCJyb2xlcyI6WyJQVUJMSVNIRVIiXX0sIjdjNjNkOTY2LTdkMDctNDUyYy04NjUzLWNiM2ViMDRjYTY3YyI6eyJwZXJtaXNzaW9ucyI6W10sInJvbGVzIjpbIlBVQkxJU0hFUiJdfSwiOGM2NGQ5NjYtN2QwNy00NTJjLTg2NTMtY2IzZWIwNGNhNDVhIjp7InBlcm1pc3Npb25zIjpbXSwicm9sZXMiOlsiUFVCTElTSEVSIl19LCI5YzU1YzZiOC1lZTFjLTRhN2YtYThiNC0zYzQxZDRlNGY2NTciOnsicGVybWlzc2lvbnMiOltdLCJyb2xlcyI6WyJQVUJMSVNIRVIiXX0sImJiZTNiZjU1LTMwYjUtNDU5Zi05M2IxLTNjYzU4NzFkYTkyNiI6eyJwZXJtaXNzaW9ucyI6W10sInJvbGVzIjpbIlBVQkxJU0hFUiJdfSwiZTJiOWM0YmMtOGRiMC00ZTJkLWIzYjQtZjk4YTkwZjNmNDliIjp7InBlcm1pc3Npb25zIjpbXSwicm9sZXMiOlsiUFVCTElTSEVSIl19LCJlNjRlYzdhNS02NzQzLTQ5ZWEtOTdmMy0zYzM3ZWQ5MDI1YmYiOnsicGVybWlzc2lvbnMiOltdLCJyb2xlcyI6WyJQVUJMSVNIRVIiXX0sImU5YTE3MGQ2LTM2NjktNDQxNi1iM2FkLTVhZTA2OGUwZjhhMiI6eyJwZXJtaXNzaW9ucyI6W10sInJvbGVzIjpbIlBVQkxJU0hFUiJdfSwiZWY3NTM0ZGUtOTMxZS00YzY4LTkzMmUtNjI2ZGExMDkyZjI5Ijp7InBlcm1pc3Npb25zIjpbXSwicm9sZXMiOlsiUFVCTElTSEVSIl19LCJlZjc1MzRkZS05MzFlLTRjNjgtOTMyZS02MjZkYTEwY2FyMjkiOnsicGVybWlzc2lvbnMiOltdLCJyb2xlcyI6WyJQVUJMSVNIRVIiXX0sImVmNzUzNGRlLTkzMWUtNGM2OC05MzJlLTYyNmRvbGQ5MmYzMyI6eyJwZXJtaXNzaW9ucyI6W10sInJvbGVzIjpbIlBVQkxJU0hFUiJdfSwiZjQ3YWMxMGItNThjYy00MzcyLWE1NjctMGUwMmIyYzNkNDc5Ijp7InBlcm1pc3Npb25zIjpbXSwicm9sZXMiOlsiUFVCTElTSEVSIl19fX0.Ly_h38RbjmVPbf_3q3rHxKXCNPZ3L7ioXqU6Cibkp_iknOT02Qwxfh14cCxDrO8wlgJ3dLKrxvBlQlZeqkWjJdNcQAeEGdz8sXnb-LFwaUvOudCMw123C9a7d9QOG9GS5wSiUoh8_Lal1gWmbjAfmkx_lZdGpw7FbTBvde9wp41Ug3j3hVc2vCKVkpuFt0d8BJe2g5i1UjtwTxmhfzMMvp_J4MjpRJAsYkQofJxImgSPIeC9SgIwo73wjeUZo51EHIm6BdE-vLpyEtUOtYtEJatqdNmrpz9kn-2KboTm5UGPViITsMGCDTGo66-wtZRSPg7ZKVbN2KxQQ2HExRSX1Q"
 
+# Tables with a dedicated loader in helpers/: (module, entry taking a dump path)
+HELPER_LOADERS = {
+    "makes": ("helpers.bulk_makes_loader", "clone_makes_table"),
+    "media_folder": ("helpers.bulk_media_folder_loader", "clone_media_folder_table"),
+    "media_library": ("helpers.bulk_media_library_loader", "clone_media_library_table"),
+    "model": ("helpers.bulk_model_loader", "clone_model_table"),
+    "price": ("helpers.bulk_price_loader", "clone_price_table"),
+    "variant_car": ("helpers.bulk_car_variants_loader", "clone_variant_car_table"),
+}
 
-if __name__=="__main__":
+
+# ---- SUBCOMMANDS ----
+def download(args):
+    from download_dev_table_data import download_db_data_from_dev
     download_db_data_from_dev(BEARER_TOKEN, LOG_FILE)
-    clean_and_restore(LOG_FILE)
+
+def restore(args):
+    if args.fanout:
+        import json
+        from fanout_restore import fanout_restore
+        with open(args.fanout, encoding="utf-8") as f:
+            fanout_restore(json.load(f), LOG_FILE)
+    elif args.merge:
+        from merge_restore import merge_and_restore
+        merge_and_restore(LOG_FILE)
+    else:
+        from clean_up_local_db import clean_and_restore
+        clean_and_restore(LOG_FILE)
+
+def clone_all(args):
+    download(args)
+    restore(args)
+
+def verify(args):
+    from local_db import INSERT_ORDER, verify_insert_order
+    verify_insert_order(INSERT_ORDER)
+
+def load_table(args):
+    if args.file and args.table in HELPER_LOADERS:
+        # The helpers read raw API rows (lowercase keys), not the downloader's dumps.
+        import importlib
+        module, entry = HELPER_LOADERS[args.table]
+        getattr(importlib.import_module(module), entry)(args.file)
+    elif args.file:
+        sys.exit(f"❌ No helper loader for {args.table}; without a file it is reloaded from dev-db-data/.")
+    else:
+        from clean_up_local_db import load_single_table
+        load_single_table(args.table, LOG_FILE)
+
+
+def reload(args):
+    from reload_tables import reload_tables
+    reload_tables(args.tables, BEARER_TOKEN, LOG_FILE, children=args.with_children, download=not args.no_download)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("all", help="download, then restore (default)").set_defaults(func=clone_all, merge=False, fanout=None)
+    sub.add_parser("download", help="download every dev table into dev-db-data/").set_defaults(func=download)
+
+    restore_parser = sub.add_parser("restore", help="restore the local DB from dev-db-data/")
+    mode = restore_parser.add_mutually_exclusive_group()
+    mode.add_argument("--merge", action="store_true", help="only write rows that differ (merge_restore.py)")
+    mode.add_argument("--fanout", metavar="TARGETS_JSON", help="restore into every DB listed in the file")
+    restore_parser.set_defaults(func=restore)
+
+    sub.add_parser("verify", help="check INSERT_ORDER against local foreign keys").set_defaults(func=verify)
+
+    load_parser = sub.add_parser("load-table", help="wipe and reload one table")
+    load_parser.add_argument("table")
+    load_parser.add_argument("file", nargs="?", help="raw API dump for the table's helpers/ loader")
+    load_parser.set_defaults(func=load_table)
+
+    reload_parser = sub.add_parser("reload", help="download and swap in just the given tables")
+    reload_parser.add_argument("tables", nargs="+")
+    reload_parser.add_argument("--with-children", action="store_true", help="also reload tables referencing them")
+    reload_parser.add_argument("--no-download", action="store_true", help="use the dumps already in dev-db-data/")
+    reload_parser.set_defaults(func=reload)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        args.command, args.func, args.merge, args.fanout = "all", clone_all, False, None
+    if args.command in ("verify", "load-table"):
+        args.func(args)
+        return
+
+    import metrics
+    metrics.start_run()
+    with metrics.profiled("db_clone"):
+        args.func(args)
+    metrics.print_summary()
+
+
+if __name__=="__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+schema_sync.py – Pre-flight reconciliation of the local schema with the dev schema cache.
+
+The downloader stores every table's columns and `SHOW CREATE TABLE` output in
+`dev-db-data/schema_cache.json`.  Before the restore wipes anything, the local
+schema is read once from information_schema and diffed against that cache:
+
+  • tables missing locally are created from the cached DDL (FK checks off, so
+    the creation order does not matter);
+  • columns missing locally are added, one `ALTER TABLE` per table (mode "add");
+  • dump keys the local table still does not know are dropped at ingest time,
+    so a schema change on dev no longer turns into one failed INSERT per row.
+
+Modes (SCHEMA_SYNC): "add" – create tables, add columns; "drop" – create
+tables, never alter existing ones, just ignore unknown keys; "off" – skip.
+"""
+
+import json
+import logging
+import os
+import re
+
+SCHEMA_CACHE_FILE = "schema_cache.json"   # written by download_dev_table_data
+MODES = ("add", "drop", "off")
+INTEGER_TYPES = {"tinyint", "smallint", "mediumint", "int", "integer", "bigint"}
+
+COLUMN_LINE_RE = re.compile(r"^\s*`(?P<name>(?:[^`]|``)+)`\s+(?P<definition>.+?),?\s*$")
+
+
+def load_schema_cache(dump_dir):
+    path = os.path.join(dump_dir, SCHEMA_CACHE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"⚠️ Could not read {path}: {e}")
+        return {}
+
+
+def parse_create_table(ddl):
+    """{column name: column definition} from a SHOW CREATE TABLE statement, in table order."""
+    columns = {}
+    for line in (ddl or "").splitlines()[1:]:
+        match = COLUMN_LINE_RE.match(line)
+        if match:
+            columns[match.group("name").replace("``", "`")] = match.group("definition")
+    return columns
+
+
+def local_columns(cursor, database):
+    """{table: [column, ...]} for every base table in the local schema."""
+    cursor.execute("""
+        SELECT c.TABLE_NAME, c.COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS c
+        JOIN INFORMATION_SCHEMA.TABLES t
+          ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+        WHERE c.TABLE_SCHEMA = %s AND t.TABLE_TYPE = 'BASE TABLE'
+        ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+    """, (database,))
+    tables = {}
+    for row in cursor.fetchall():
+        tables.setdefault(row["TABLE_NAME"], []).append(row["COLUMN_NAME"])
+    return tables
+
+
+def cached_column_names(entry):
+    names = [col["name"] for col in entry.get("columns") or []]
+    return names or list(parse_create_table(entry.get("create_table")))
+
+
+def reconcile_schema(conn, database, schema_cache, tables, mode="add"):
+    """
+    Bring the local schema in line with `schema_cache` for `tables`.
+    Returns ({table: set of dump keys that can be inserted}, [tables that cannot be restored]).
+    """
+    if mode == "off":
+        return {}, []
+    allowed, unusable = {}, []
+    with conn.cursor() as cursor:
+        existing = local_columns(cursor, database)
+        existing_lower = {table.lower(): table for table in existing}
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0;")
+        try:
+            for table in tables:
+                entry = schema_cache.get(table)
+                local_table = existing_lower.get(table.lower())
+                if local_table is None:
+                    if not entry or not entry.get("create_table"):
+                        logging.error(f"❌ {table} does not exist locally and has no cached CREATE TABLE – skipping it")
+                        unusable.append(table)
+                        continue
+                    try:
+                        cursor.execute(entry["create_table"])
+                    except Exception as e:
+                        logging.error(f"❌ Failed to create {table}: {e}")
+                        unusable.append(table)
+                        continue
+                    logging.info(f"🆕 Created missing table {table} from the dev schema")
+                    print(f"🆕 Created missing table {table}")
+                    existing[table] = cached_column_names(entry)
+                    local_table = table
+                if not entry:
+                    continue
+
+                local = {col.lower() for col in existing[local_table]}
+                definitions = parse_create_table(entry.get("create_table"))
+                missing = [col for col in cached_column_names(entry) if col.lower() not in local]
+                addable = [col for col in missing if col in definitions]
+                if mode == "add" and addable:
+                    clauses = ", ".join(f"ADD COLUMN `{col}` {definitions[col]}" for col in addable)
+                    try:
+                        cursor.execute(f"ALTER TABLE `{local_table}` {clauses}")
+                        local.update(col.lower() for col in addable)
+                        logging.info(f"➕ {table}: added columns {', '.join(addable)}")
+                        print(f"➕ {table}: added {len(addable)} column(s)")
+                    except Exception as e:
+                        logging.error(f"❌ Failed to add columns {', '.join(addable)} to {table}: {e}")
+
+                dropped = [col for col in missing if col.lower() not in local]
+                if dropped:
+                    logging.warning(f"⚠️ {table}: ignoring dump columns missing locally: {', '.join(dropped)}")
+                allowed[table] = ({col for col in cached_column_names(entry) if col.lower() in local}
+                                  | set(existing[local_table]))
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1;")
+    return allowed, unusable
@@ -0,0 +1,76 @@
+"""
+table_rows.py – Compact in-memory representation of one table's dump.
+
+Every row is a positional tuple aligned to a single column index shared by
+all rows of the table.  Columns that have to be written in a later pass
+(self-referencing FKs such as `model.nextModelId`) are blanked in the tuple
+and their real values are kept in a side array aligned with `rows`.
+"""
+
+
+class TableRows:
+    __slots__ = ("table", "columns", "index", "rows", "deferred_columns", "deferred")
+
+    def __init__(self, table, columns, rows=None, deferred_columns=(), deferred=None):
+        self.table = table
+        self.columns = tuple(columns)
+        self.index = {col: i for i, col in enumerate(self.columns)}
+        self.rows = rows if rows is not None else []
+        self.deferred_columns = tuple(deferred_columns)
+        self.deferred = deferred if deferred is not None else {col: [] for col in self.deferred_columns}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __bool__(self):
+        return bool(self.rows)
+
+    def column(self, name):
+        """Return the values of one column (deferred columns included)."""
+        if name in self.deferred:
+            return self.deferred[name]
+        i = self.index[name]
+        return [row[i] for row in self.rows]
+
+    def chunks(self, size):
+        """Yield (start_offset, rows) slices of at most `size` rows."""
+        for start in range(0, len(self.rows), size):
+            yield start, self.rows[start:start + size]
+
+    @classmethod
+    def from_dicts(cls, table, data, deferred_columns=(), allowed_columns=None):
+        """
+        Convert a list of row dicts into a TableRows, in place.
+
+        Each dict is replaced by its tuple as soon as it is converted, so the
+        dicts are released progressively instead of living alongside the
+        tuples until the end.  `allowed_columns` (a set) drops dump keys the
+        target table does not know about.
+        """
+        columns = []
+        seen = set()
+        known_keys = None
+        for row in data:
+            # Dumps come from `SELECT *`, so normally every row shares the
+            # first row's keys and this is a single keys-view comparison.
+            if known_keys is not None and row.keys() == known_keys:
+                continue
+            known_keys = row.keys()
+            for key in row:
+                if key not in seen and (allowed_columns is None or key in allowed_columns):
+                    seen.add(key)
+                    columns.append(key)
+        deferred_columns = tuple(col for col in deferred_columns if col in seen)
+        # Deferred columns stay in the tuple (as NULL) so the first-pass INSERT
+        # still lists them; their values move to the side array.
+        deferred_positions = [(col, columns.index(col)) for col in deferred_columns]
+        deferred = {col: [] for col in deferred_columns}
+
+        for i, row in enumerate(data):
+            values = [row.get(col) for col in columns]
+            for col, pos in deferred_positions:
+                deferred[col].append(values[pos])
+                values[pos] = None
+            data[i] = tuple(values)
+
+        return cls(table, columns, data, deferred_columns, deferred)
@@ -0,0 +1,113 @@
+"""DevApiClient against dev_api_stub: retries, backoff, gzip and keep-alive."""
+
+import asyncio
+import json
+
+import pytest
+
+import dev_api_stub
+from dev_api_client import DevApiClient, DevApiError
+
+ROWS = [{"id": i, "name": f"price {i}", "onRoadPrice": 100000 + i} for i in range(1, 201)]
+QUERY = "SELECT * FROM `price` ORDER BY `id` LIMIT 50 OFFSET 0;"
+
+
+@pytest.fixture
+def dump_dir(tmp_path):
+    with open(tmp_path / "price_dump.json", "w", encoding="utf-8") as f:
+        json.dump(ROWS, f)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def stub(dump_dir):
+    servers = []
+
+    def start(**options):
+        server = dev_api_stub.serve(dump_dir, port=0, **options)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def url(server):
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{dev_api_stub.EXECUTE_PATH}"
+
+
+def run_queries(server, queries, **client_options):
+    """Run `queries` concurrently on one client; returns (results, client.request_count)."""
+    client_options.setdefault("backoff_base", 0.01)
+
+    async def main():
+        async with DevApiClient(url(server), {}, **client_options) as client:
+            results = await asyncio.gather(*(client.execute(query) for query in queries))
+            return results, client.request_count
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retries_until_success(stub, status):
+    server = stub(fail_first=2, fail_status=status)
+    (result,), requests = run_queries(server, [QUERY], max_retries=5)
+    assert requests == 3
+    assert server.stats.failures == 2
+    assert result["data"]["success"] is True
+    assert result["data"]["data"] == ROWS[:50]
+
+
+def test_gives_up_after_max_retries(stub):
+    server = stub(fail_first=10, fail_status=503)
+    with pytest.raises(DevApiError, match="HTTP 503"):
+        run_queries(server, [QUERY], max_retries=2)
+    assert server.stats.received == 3
+
+
+def test_client_errors_are_not_retried(stub):
+    server = stub(fail_first=10, fail_status=400)
+    with pytest.raises(DevApiError, match="HTTP 400"):
+        run_queries(server, [QUERY], max_retries=5)
+    assert server.stats.received == 1
+
+
+def test_backoff_is_capped():
+    client = DevApiClient("http://unused", {}, backoff_base=0.5, backoff_cap=2.0)
+    delays = [client._backoff(attempt) for attempt in range(12) for _ in range(20)]
+    assert all(0 <= delay <= 2.0 for delay in delays)
+    assert max(delays) > 1.0   # the exponential part did grow up to the cap
+    assert client._backoff(0, retry_after="120") == 2.0
+    assert client._backoff(0, retry_after="0.25") == 0.25
+
+
+def test_retry_after_is_honoured(stub):
+    server = stub(fail_first=1, fail_status=429, retry_after=0.2)
+
+    async def main():
+        async with DevApiClient(url(server), {}, backoff_base=0.0, backoff_cap=5.0) as client:
+            started = asyncio.get_running_loop().time()
+            await client.execute(QUERY)
+            return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(main()) >= 0.2
+
+
+def test_gzip_responses_are_decoded(stub):
+    server = stub()
+    (result,), _ = run_queries(server, ["SELECT * FROM `price`;"])
+    assert server.stats.gzipped == 1
+    assert result["data"]["data"] == ROWS
+    assert server.stats.bytes_sent < len(json.dumps(result).encode("utf-8"))
+
+
+def test_connections_are_kept_alive(stub):
+    server = stub()
+    queries = [f"SELECT * FROM `price` ORDER BY `id` LIMIT 10 OFFSET {offset};" for offset in range(0, 200, 10)]
+    results, requests = run_queries(server, queries, concurrency=2)
+    assert requests == len(queries)
+    assert [row for result in results for row in result["data"]["data"]] == ROWS
+    assert server.stats.connections <= 2
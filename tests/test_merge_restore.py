@@ -0,0 +1,56 @@
+"""A dump row and the same row read back from MySQL must hash equal, or the merge rewrites everything."""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import merge_restore as merge
+
+
+class FakeCursor:
+    def __init__(self, row):
+        self.row = row
+
+    def execute(self, sql):
+        self.sql = sql
+
+    def fetchone(self):
+        return self.row
+
+
+def test_float_decimal_and_decimal_string_hash_equal_on_numeric_columns():
+    assert merge.row_hash([1.5], {0}) == merge.row_hash([Decimal("1.50")], {0}) == merge.row_hash(["1.50"], {0})
+    assert merge.row_hash([12.0], {0}) == merge.row_hash([Decimal("12.00")], {0}) == merge.row_hash([12], {0})
+
+
+def test_decimal_string_stays_text_on_other_columns():
+    assert merge.canonical("1.50") == "1.50"
+    assert merge.row_hash(["1.50"]) != merge.row_hash([Decimal("1.50")])
+
+
+def test_bool_matches_tinyint():
+    assert merge.canonical(True) == merge.canonical(1) == 1
+    assert merge.row_hash([False]) == merge.row_hash([0])
+
+
+def test_iso_datetime_with_offset_matches_local_datetime():
+    local = datetime(2025, 3, 17, 16, 47, 17, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    assert merge.canonical("2025-03-17T22:17:17+05:30") == merge.canonical(local)
+    assert merge.canonical("2025-03-17T22:17:17") == merge.canonical(datetime(2025, 3, 17, 22, 17, 17))
+
+
+def test_json_text_matches_parsed_json():
+    assert merge.canonical('{"b": 1, "a": 2}') == merge.canonical({"a": 2, "b": 1})
+    assert merge.canonical("[1, 2]") == merge.canonical([1, 2])
+    assert merge.canonical("{not json") == "{not json"
+
+
+def test_changed_rows_hash_differently():
+    assert merge.row_hash([1, "name", Decimal("1.50")], {2}) != merge.row_hash([1, "name", Decimal("1.51")], {2})
+    assert merge.row_hash([1, None]) != merge.row_hash([1, ""])
+
+
+def test_only_integer_ids_are_merged():
+    assert merge.has_integer_id(FakeCursor(("id", "bigint unsigned", "NO", "PRI", None, "")), "price")
+    assert merge.has_integer_id(FakeCursor(("id", b"int(11)", "NO", "PRI", None, "")), "price")
+    assert not merge.has_integer_id(FakeCursor(("id", "varchar(36)", "NO", "PRI", None, "")), "make")
+    assert not merge.has_integer_id(FakeCursor(None), "make_tags")
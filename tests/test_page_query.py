@@ -0,0 +1,22 @@
+"""Page queries must impose a total order, or OFFSET pages overlap and skip rows."""
+
+import download_dev_table_data as downloader
+
+KEYSET = [{"name": "id", "key": "PRI", "type": "int"}, {"name": "name", "key": "", "type": "varchar"}]
+COMPOSITE = [{"name": "modelId", "key": "PRI", "type": "int"}, {"name": "tagId", "key": "PRI", "type": "int"}]
+NO_KEY = [{"name": "tag", "key": "", "type": "varchar"}, {"name": "modelId", "key": "MUL", "type": "int"}]
+
+
+def test_integer_primary_key_uses_keyset_paging():
+    assert downloader.page_query("price", KEYSET, 100, after=41, upper=90) == \
+        "SELECT * FROM `price` WHERE `id` > 41 AND `id` <= 90 ORDER BY `id` LIMIT 100;"
+
+
+def test_composite_primary_key_orders_by_it():
+    assert downloader.page_query("model_tags", COMPOSITE, 100, offset=200) == \
+        "SELECT * FROM `model_tags` ORDER BY `modelId`, `tagId` LIMIT 100 OFFSET 200;"
+
+
+def test_table_without_primary_key_orders_by_every_column():
+    assert downloader.page_query("make_tags", NO_KEY, 100, offset=100) == \
+        "SELECT * FROM `make_tags` ORDER BY `tag`, `modelId` LIMIT 100 OFFSET 100;"